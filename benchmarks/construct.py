@@ -0,0 +1,49 @@
+"""Times YAMLator construction with shared and with per-instance registration.
+
+Run from the repository root:
+
+    python benchmarks/construct.py [-n NUMBER]
+
+The per-instance timing registers the default key types and utilities on
+every new instance, the way YAMLator.__init__ used to.
+"""
+import argparse
+import pathlib
+import sys
+import timeit
+from collections import OrderedDict
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+
+from yamlgator.YAMLator import YAMLator, DEFAULT_KEY_TYPES, DEFAULT_UTILITIES
+
+
+class _PerInstanceYAMLator(YAMLator):
+    def __init__(self, odict_or_yamlator_or_tree=None, root_dir=None):
+        super().__init__(odict_or_yamlator_or_tree, root_dir)
+        for _key_type, (_key_regex, _object_constructor_data) in DEFAULT_KEY_TYPES.items():
+            self.add_object(_key_type, _key_regex, *_object_constructor_data)
+        for _attribute_name, _transformer_class in DEFAULT_UTILITIES.items():
+            self.register(_transformer_class, _attribute_name)
+
+
+def _tree(width=10):
+    return OrderedDict((f'k{_i}', OrderedDict(a='A', b='B')) for _i in range(width))
+
+
+def main():
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _parser.add_argument('-n', '--number', type=int, default=20000, help='constructions per timing')
+    _args = _parser.parse_args()
+
+    _odict = _tree()
+    _timings = []
+    for _name, _class in (('per-instance', _PerInstanceYAMLator), ('shared', YAMLator)):
+        _seconds = min(timeit.repeat(lambda: _class(_odict), number=_args.number, repeat=3))
+        _timings.append(_seconds)
+        print(f'{_name:14} {_seconds / _args.number * 1e6:8.2f} us/YAMLator')
+    print(f'{"speedup":14} {_timings[0] / _timings[1]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
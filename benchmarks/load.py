@@ -0,0 +1,58 @@
+"""Compares Tree.load with the pure Python and the libyaml loaders.
+
+Run from the repository root:
+
+    python benchmarks/load.py [-n NUMBER] [YAML_FILE ...]
+
+Without files, the largest YAML fixtures under tests/ are used.
+"""
+import argparse
+import io
+import pathlib
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+
+from yamlgator.tree import Tree
+
+TESTS_DIR = pathlib.Path(__file__).absolute().parent.parent.joinpath('tests')
+# where the merge tests write their temporary documents
+TESTS_TMP_DIR = TESTS_DIR.joinpath('YAMLator', 'tmp')
+
+
+def _largest_fixtures(count=3):
+    _paths = [_path for _path in TESTS_DIR.rglob('*.yaml') if not _path.is_relative_to(TESTS_TMP_DIR)]
+    _paths.sort(key=lambda p: p.stat().st_size, reverse=True)
+    return _paths[:count]
+
+
+def main():
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _parser.add_argument('-n', '--number', type=int, default=50, help='loads per timing')
+    _parser.add_argument('paths', nargs='*', type=pathlib.Path)
+    _args = _parser.parse_args()
+
+    _loaders = [('BaseLoader', yaml.BaseLoader)]
+    if hasattr(yaml, 'CBaseLoader'):
+        _loaders.append(('CBaseLoader', yaml.CBaseLoader))
+    else:
+        print('PyYAML was built without libyaml; only timing BaseLoader')
+
+    for _path in _args.paths or _largest_fixtures():
+        _text = _path.read_text()
+        _timings = []
+        for _name, _loader in _loaders:
+            _seconds = min(timeit.repeat(
+                lambda: Tree.load(io.StringIO(_text), Loader=_loader), number=_args.number, repeat=3))
+            _timings.append(_seconds)
+            _label = str(_path.relative_to(TESTS_DIR)) if _path.is_relative_to(TESTS_DIR) else str(_path)
+            print(f'{_label:45} {len(_text):>8} chars  {_name:12} {_seconds / _args.number * 1e3:8.3f} ms/load')
+        if len(_timings) > 1:
+            print(f'{"":45} {"":>8}        speedup      {_timings[0] / _timings[1]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -31,6 +31,47 @@ class TestYAMLator(unittest.TestCase):
 
         self.assertIsInstance(_yltr.get_as_object('my-path'),pathlib.Path)
 
+    @debug_on(Exception)
+    def test_key_type(self):
+        _yltr = YAMLator(OrderedDict())
+        self.assertEqual(_yltr.key_type('is-a'), 'bool')
+        self.assertEqual(_yltr.key_type('my-path'), 'path')
+        self.assertEqual(_yltr.key_type('my-path-x'), None)
+        self.assertEqual(_yltr.key_type('api-url'), 'url')
+        self.assertEqual(_yltr.key_type('host'), None)
+
+        # registering a type is seen by keys classified before
+        _yltr.add_object('int', r'.*-(count|port)$', int)
+        self.assertEqual(_yltr.key_type('host-port'), 'int')
+        self.assertEqual(_yltr.get_object('host-port', '8080'), 8080)
+        self.assertEqual(_yltr.key_type('my-path'), 'path')
+        with self.assertRaises(YAMLatorException):
+            _yltr.key_type('use-count')
+
+        _yltr.add_object('timeout', r'.*-timeout$', float)
+        self.assertEqual(_yltr.key_type('read-timeout'), 'timeout')
+        with self.assertRaises(YAMLatorException):
+            _yltr.key_type('is-read-timeout')
+        self.assertEqual(YAMLator(OrderedDict()).key_type('read-timeout'), None)
+
+    @debug_on(Exception)
+    def test_shared_registry(self):
+        _yltr = YAMLator(OrderedDict(a=OrderedDict(b='B')))
+        _other = _yltr.get('a/')
+        self.assertNotIn('regexes', vars(_yltr))
+        self.assertIs(_yltr.transform_values._args[0], _yltr)
+        self.assertIs(_yltr.transform_values, _yltr.transform_values)
+        self.assertIsNot(_yltr.transform_values, _other.transform_values)
+        self.assertIs(_yltr.path, _other.path)
+
+        # customising one instance leaves the others alone
+        _yltr.add_object('int', r'.*-port$', int)
+        _yltr.register(ValueTransformerUtility, 'transform_values_again')
+        self.assertEqual(_yltr.key_types(), ['path', 'url', 'bool', 'int'])
+        self.assertEqual(YAMLator(OrderedDict()).key_types(), ['path', 'url', 'bool'])
+        self.assertFalse(hasattr(YAMLator(OrderedDict()), 'int'))
+        self.assertFalse(hasattr(YAMLator(OrderedDict()), 'transform_values_again'))
+
     @debug_on(Exception)
     def test_objects(self):
         _tests_yaml = self.tests_dir.joinpath('objects.yaml')
@@ -85,7 +126,10 @@ class TestYAMLator(unittest.TestCase):
         _tmp_dir.mkdir(exist_ok=True)
         _ymltr = self.yamlator_factory(_test_odict,_tmp_dir)
 
-        _tmp_yaml = pathlib.Path(tempfile.mkstemp(dir=_tmp_dir,suffix='.yaml')[1])
+        _tmp_fd, _tmp_yaml = tempfile.mkstemp(dir=_tmp_dir,suffix='.yaml')
+        os.close(_tmp_fd)
+        _tmp_yaml = pathlib.Path(_tmp_yaml)
+        self.addCleanup(_tmp_yaml.unlink, missing_ok=True)
         with _tmp_yaml.open('w') as _f:
             Tree(_to_merge_odict).dump(_f)
 
@@ -134,7 +178,10 @@ class TestYAMLator(unittest.TestCase):
         _tmp_dir.mkdir(exist_ok=True)
         _ymltr = self.yamlator_factory(OrderedDict(),_tmp_dir)
 
-        _tmp_yaml = pathlib.Path(tempfile.mkstemp(dir=_tmp_dir,suffix='.yaml')[1])
+        _tmp_fd, _tmp_yaml = tempfile.mkstemp(dir=_tmp_dir,suffix='.yaml')
+        os.close(_tmp_fd)
+        _tmp_yaml = pathlib.Path(_tmp_yaml)
+        self.addCleanup(_tmp_yaml.unlink, missing_ok=True)
         with _tmp_yaml.open('w') as _f:
             Tree(_config_odict).dump(_f)
 
@@ -154,6 +201,379 @@ class TestYAMLator(unittest.TestCase):
                 _input_tree.transform()
                 self.assertEqual(_input_tree, _output_tree)
 
+    @debug_on(Exception)
+    def test_transform_scheduling(self):
+        _test_odict = OrderedDict(
+            a=OrderedDict(b='AB', c=')){d}-AC'),
+            d=')){e}-D',
+            e='E',
+            f=OrderedDict(g='FG', h=['FH', 1]),
+        )
+        _expected = OrderedDict(
+            a=OrderedDict(b='AB', c='E-D-AC'),
+            d='E-D',
+            e='E',
+            f=OrderedDict(g='FG', h=['FH', '1']),
+        )
+
+        class _Counter(AbstractEvaluator):
+            def __init__(self, odict_or_tree, **kwargs):
+                super().__init__(odict_or_tree)
+
+            def _value_evaluate(self, value, keychain):
+                _seen.append('/'.join(keychain))
+
+        for _markers, _expected_seen in (
+                # literal leaves are skipped, and settled branches once a walk saw them so
+                ((KEY_OR_KEYCHAIN_OP,), ['a/c']),
+                # an evaluator that does not declare markers walks everything
+                (None, ['a/b', 'a/c', 'd', 'e', 'f/g', 'f/h'] * 3)):
+            _seen = []
+            _Counter.markers = _markers
+            _yltr = self.yamlator_factory(_test_odict)
+            _yltr.register(_Counter, 'count')
+            _yltr.transform(methods=['transform_values', 'count'])
+            self.assertEqual(_yltr.odict, _expected)
+            self.assertEqual(_seen, _expected_seen)
+            self.assertIsNone(_yltr._fingerprints)
+
+    @debug_on(Exception)
+    def test_transform_direct_edits(self):
+        class _Direct(AbstractEvaluator):
+            markers = (KEY_OR_KEYCHAIN_OP,)
+
+            def __init__(self, odict_or_tree, **kwargs):
+                super().__init__(odict_or_tree)
+
+            def evaluate(self, *args):
+                # writes to the odict without _on_invalidate(), once
+                if not _edited:
+                    self.odict['b'] = '))a'
+                    _edited.append(True)
+
+        for _fused in (False, True):
+            _edited = []
+            _yltr = self.yamlator_factory(OrderedDict(a='A', b='B'))
+            _yltr.register(_Direct, 'direct')
+            _yltr.transform(methods=['transform_values', 'direct'], fused=_fused)
+            # the fixed point is confirmed with a fresh digest, so the edit is transformed too
+            self.assertEqual(_yltr.odict, OrderedDict(a='A', b='A'))
+
+        class _DeeperKey(AbstractEvaluator):
+            def __init__(self, odict_or_tree, **kwargs):
+                super().__init__(odict_or_tree)
+
+            def _pre_evaluate(self, node, keychain):
+                # adds a deeper x to its branch without _on_invalidate()
+                if keychain == ['b', 'c']:
+                    node['x'] = 'deep'
+
+        for _fused in (False, True):
+            _yltr = self.yamlator_factory(OrderedDict(
+                a=OrderedDict(x='shallow'), b=OrderedDict(c=OrderedDict(y='Y')), v='))x'))
+            _yltr.register(_DeeperKey, 'deeper_key')
+            # the index the transform uses is built before the key is added
+            _yltr.index_keys()
+            self.assertEqual(_yltr.dfs('x'), (['', 'a', 'x'], 'shallow'))
+            _yltr.transform(methods=['deeper_key', 'transform_values'], fused=_fused)
+            # relative lookups during the transform find the deepest x, as a walk would
+            self.assertEqual(_yltr.get('/v'), 'deep')
+
+    @debug_on(Exception)
+    def test_transform_dependency_order(self):
+        # each key refers to the next one, further down the document; a pass
+        # copies the unresolved variables along, so the chain halves each pass
+        _test_odict = OrderedDict((f'k{_i}', f'))k{_i + 1}') for _i in range(8))
+        _test_odict['k8'] = 'end'
+
+        _yltr = self.yamlator_factory(_test_odict)
+        _report = _yltr.transform()
+        self.assertEqual(_report.passes, 5)
+        self.assertEqual(_report.passes_saved, 0)
+
+        _ordered = self.yamlator_factory(_test_odict)
+        _report = _ordered.transform(dependency_order=True)
+        self.assertEqual(_ordered, _yltr)
+        self.assertEqual(_report, TransformReport(passes=1, scheduled=8, passes_saved=4))
+
+        # variables of every kind still end up as the loop alone leaves them
+        _tests_yaml = self.tests_dir.parent.joinpath('transformers/test-docs/basic-tests.yaml')
+        with _tests_yaml.open('r') as f:
+            _tests_tree = YAMLator.load(f)
+        for _test_name in _tests_tree.keys():
+            _input_tree = _tests_tree.get(['', _test_name, 'input', ''])
+            _yltr = YAMLator(_input_tree.copy(), root_dir=_tests_yaml.parent)
+            _ordered = YAMLator(_input_tree.copy(), root_dir=_tests_yaml.parent)
+            _passes = _yltr.transform(methods=['transform_values']).passes
+            _report = _ordered.transform(methods=['transform_values'], dependency_order=True)
+            self.assertEqual(_ordered, _yltr, _test_name)
+            self.assertEqual(_report.passes + _report.passes_saved, _passes, _test_name)
+
+    @debug_on(Exception)
+    def test_transform_cache(self):
+        with tempfile.TemporaryDirectory() as _tmp_dir:
+            _tmp_dir = pathlib.Path(_tmp_dir)
+            _config = _tmp_dir.joinpath('config.yaml')
+            _config.write_text("a: ./a.yaml#x\nb: ./b.yaml#y\nc: ))a\n")
+            _a_yaml = _tmp_dir.joinpath('a.yaml')
+            _a_yaml.write_text("x: A\n")
+            _cache = TransformCache(_tmp_dir.joinpath('cache'))
+
+            def _load(hits, misses):
+                _yltr = _cache.load(_config)
+                self.assertEqual((_cache.hits, _cache.misses), (hits, misses))
+                self.assertEqual(_yltr.root_dir, _tmp_dir)
+                return _yltr.odict
+
+            self.assertEqual(_load(0, 1), OrderedDict(a='A', b='./b.yaml#y', c='A'))
+            self.assertEqual(_load(1, 1), OrderedDict(a='A', b='./b.yaml#y', c='A'))
+
+            # a touched file is hashed again, a changed one is transformed again
+            os.utime(_a_yaml, ns=(0, 0))
+            _load(2, 1)
+            _a_yaml.write_text("x: AA\n")
+            self.assertEqual(_load(2, 2)['c'], 'AA')
+
+            # files that were missing count too
+            _tmp_dir.joinpath('b.yaml').write_text("y: B\n")
+            self.assertEqual(_load(2, 3)['b'], 'B')
+
+            # a corrupt entry is rebuilt
+            _entry, = _cache.cache_dir.glob('*' + TransformCache.SUFFIX)
+            _entry.write_bytes(_entry.read_bytes()[:20])
+            self.assertEqual(_load(2, 4), OrderedDict(a='AA', b='B', c='AA'))
+            _load(3, 4)
+
+            _cache.clear()
+            _load(3, 5)
+
+            # an entry is kept per transform() setting
+            _cache.load(_config, dependency_order=True)
+            self.assertEqual((_cache.hits, _cache.misses), (3, 6))
+            _cache.load(_config, dependency_order=True)
+            self.assertEqual((_cache.hits, _cache.misses), (4, 6))
+            _load(5, 6)
+
+    @debug_on(Exception)
+    def test_transform_budget(self):
+        class _Ticker(YAMLator):
+            ticks = 0
+
+            def tick(self):
+                # a bang that never settles
+                self.ticks += 1
+                return f'{self.ticks} ))!tick()'
+
+        _yltr = _Ticker(OrderedDict(a='))!tick()', b=OrderedDict(c='))d', d='D')))
+        with self.assertRaises(TransformBudgetException) as _cm:
+            _yltr.transform(max_passes=4)
+        self.assertIs(_cm.exception.tree, _yltr)
+        self.assertEqual(_cm.exception.passes, 4)
+        self.assertEqual(_cm.exception.report.passes, 4)
+        self.assertEqual(_cm.exception.changed_keychains, [['', 'a']])
+        self.assertEqual(_yltr.odict, OrderedDict(a='1 2 3 4 ))!tick()', b=OrderedDict(c='D', d='D')))
+
+        with self.assertRaises(TransformBudgetException) as _cm:
+            _yltr.transform(timeout=0)
+        self.assertEqual(_cm.exception.passes, 1)
+
+        # a document that settles within the budget is transformed as usual
+        _yltr = YAMLator(OrderedDict(a='))b', b='))c', c='C'))
+        self.assertEqual(_yltr.transform(max_passes=3, timeout=60).passes, 3)
+        self.assertEqual(_yltr.odict, OrderedDict(a='C', b='C', c='C'))
+
+    @debug_on(Exception)
+    def test_transform_profile(self):
+        with tempfile.TemporaryDirectory() as _tmp_dir:
+            _tmp_dir = pathlib.Path(_tmp_dir)
+            _tmp_dir.joinpath('a.yaml').write_text("x: X\n")
+            _yltr = YAMLator(OrderedDict(
+                a='))b', b='))c', c='./a.yaml#x', d=OrderedDict(e='E', f='F')), root_dir=_tmp_dir)
+            _report = _yltr.transform(methods=['transform_values', 'transform_yaml'], profile=True)
+            self.assertEqual(_yltr.odict['a'], 'X')
+
+            _profile = _report.profile
+            self.assertEqual(len(_profile.records), 2 * _report.passes)
+            self.assertEqual([(_record.utility, _record.iteration) for _record in _profile.records[:2]],
+                             [('transform_values', 1), ('transform_yaml', 1)])
+            _totals = _profile.totals()
+            self.assertEqual(_totals['transform_values'].iteration, _report.passes)
+            self.assertGreaterEqual(_totals['transform_values'].substitutions, 3)
+            self.assertEqual(_totals['transform_yaml'].files_read, 1)
+            self.assertEqual(_totals['transform_yaml'].substitutions, 1)
+            # the settled branch is skipped after the first pass
+            self.assertGreater(_profile.records[-1].cache_hits, 0)
+            self.assertLess(_profile.records[-1].nodes_visited, _profile.records[0].nodes_visited)
+            self.assertIn('/a', [_keychain for _keychain, _seconds in _profile.hottest_keychains()])
+
+            _json = json.loads(_profile.to_json(count=2))
+            self.assertEqual(len(_json['hottest_keychains']), 2)
+            self.assertEqual(_json['records'][0]['utility'], 'transform_values')
+
+            # the utilities are left unwrapped, and a plain transform records nothing
+            self.assertNotIn('_extract_tokens', vars(_yltr.transform_values()))
+            self.assertIsNone(_yltr.transform().profile)
+
+    @debug_on(Exception)
+    def test_fused_transform(self):
+        with tempfile.TemporaryDirectory() as _tmp_dir:
+            _tmp_dir = pathlib.Path(_tmp_dir)
+            _tmp_dir.joinpath('a.yaml').write_text("x: ))b\n")
+            _odict = OrderedDict(
+                a='./a.yaml#x', b='))c', c='C', name=OrderedDict(me='))@ of ))@[-1]'),
+                url='https://example.com/#top', rest='))missing', n=5, l=[OrderedDict(d='D')],
+                plain=OrderedDict(('p' + str(_i), 'P') for _i in range(10)))
+
+            _yltr = YAMLator(Tree(_odict).copy().odict, root_dir=_tmp_dir)
+            _report = _yltr.transform()
+            _fused_yltr = YAMLator(Tree(_odict).copy().odict, root_dir=_tmp_dir)
+            _fused_report = _fused_yltr.transform(fused=True, profile=True)
+            self.assertEqual(_fused_yltr.odict, _yltr.odict)
+            self.assertEqual(_fused_report.passes, _report.passes)
+            self.assertEqual(_fused_yltr.odict['a'], 'C')
+            self.assertEqual(_fused_yltr.odict['n'], '5')
+
+            _utilities = [_record.utility for _record in _fused_report.profile.records]
+            # nothing in the tree is a bang or an if
+            self.assertNotIn('transform_bangs', _utilities)
+            self.assertNotIn('transform_ifs', _utilities)
+            # the at utility only evaluates the leaf that holds one
+            _ats = [_record for _record in _fused_report.profile.records if _record.utility == 'transform_ats']
+            self.assertEqual([_record.nodes_visited for _record in _ats], [1])
+
+    @debug_on(Exception)
+    def test_parsed_file_cache(self):
+        with tempfile.TemporaryDirectory() as _tmp_dir:
+            _tmp_dir = pathlib.Path(_tmp_dir)
+            _common = _tmp_dir.joinpath('common.yaml')
+            _common.write_text("a: A\nb:\n  c: C\n")
+            _tmp_dir.joinpath('nested.yaml').write_text("d: ./common.yaml#b/c\n")
+            _tmp_dir.joinpath('motd').write_text("hello")
+            _odict = OrderedDict(
+                a1='./common.yaml#a', a2='./common.yaml#a', b='./common.yaml#b/',
+                d='./nested.yaml#d', m1='./motd#', m2='./motd#')
+
+            _file_cache = ParsedFileCache()
+            with _file_cache.active():
+                _yltr = YAMLator(deepcopy(_odict), root_dir=_tmp_dir)
+                _yltr.transform()
+                self.assertEqual(_yltr.odict, OrderedDict(
+                    a1='A', a2='A', b=OrderedDict(c='C'), d='C', m1='hello', m2='hello'))
+                # each file is parsed once, however often it is selected
+                self.assertEqual(_file_cache.misses, 3)
+                self.assertGreaterEqual(_file_cache.hits, 4)
+
+                # selections are copies
+                _yltr.get('b/c', 'X')
+                _yltr.merge(_common, 'merged')
+                self.assertEqual(_yltr.get('merged/b/c'), 'C')
+                self.assertEqual(_file_cache.misses, 3)
+
+                # a changed file is parsed again
+                _common.write_text("a: AA\nb:\n  c: CC\n")
+                _yltr = YAMLator(deepcopy(_odict), root_dir=_tmp_dir)
+                _yltr.transform()
+                self.assertEqual((_yltr.odict['a1'], _yltr.odict['d']), ('AA', 'CC'))
+                self.assertEqual(_file_cache.misses, 4)
+
+                # the cache is active in this thread only
+                _other = YAMLator(deepcopy(_odict), root_dir=_tmp_dir)
+                _current = []
+                def _transform():
+                    _current.append(ParsedFileCache.current())
+                    _other.transform()
+                _thread = threading.Thread(target=_transform)
+                _thread.start()
+                _thread.join()
+                self.assertEqual(_current, [None])
+                self.assertEqual(_other.odict['m1'], 'hello')
+                self.assertEqual(_file_cache.misses, 4)
+            self.assertIsNone(ParsedFileCache.current())
+
+            # the paths a transform tries to read are recorded in the list it is given
+            _read_paths = []
+            YAMLator(OrderedDict(a='./common.yaml#a', x='./missing.yaml#x'), root_dir=_tmp_dir).transform(
+                read_paths=_read_paths)
+            self.assertEqual(sorted(set(_read_paths)), [_tmp_dir.joinpath('common.yaml'), _tmp_dir.joinpath('missing.yaml')])
+
+            _file_cache = ParsedFileCache(max_entries=1)
+            with _file_cache.active():
+                YAMLator(deepcopy(_odict), root_dir=_tmp_dir).transform()
+            self.assertEqual(len(_file_cache.entries), 1)
+            _file_cache.clear()
+            self.assertEqual(len(_file_cache.entries), 0)
+
+    @debug_on(Exception)
+    def test_compiled_template(self):
+        with tempfile.TemporaryDirectory() as _tmp_dir:
+            _tmp_dir = pathlib.Path(_tmp_dir)
+            _tmp_dir.joinpath('common.yaml').write_text("region: eu\nsizes:\n  small: 1\n  large: 4\n")
+            _template_odict = OrderedDict(
+                region='./common.yaml#region',
+                size='./common.yaml#sizes/))size',
+                name='))tenant',
+                zone='))region',
+                fixed='F',
+            )
+            _template = YAMLator(deepcopy(_template_odict), root_dir=_tmp_dir).compile()
+            # the context-free selector is read once, up front
+            self.assertEqual(_template.odict['region'], 'eu')
+            self.assertEqual(sorted(_template.holes), [['name'], ['size'], ['zone']])
+
+            _contexts = [OrderedDict(tenant=f't{_i}', region='us', size='large' if _i % 2 else 'small')
+                         for _i in range(5)]
+            _expected = []
+            for _context in _contexts:
+                _yltr = YAMLator(deepcopy(_template_odict), root_dir=_tmp_dir)
+                _yltr.transform(context_tree=Tree(deepcopy(_context)))
+                _expected.append(_yltr.odict)
+            self.assertEqual(_expected[1], OrderedDict(region='eu', size='4', name='t1', zone='us', fixed='F'))
+            self.assertEqual(_template.render(Tree(deepcopy(_contexts[0]))).odict, _expected[0])
+            self.assertEqual([_yltr.odict for _yltr in _template.render_many(_contexts)], _expected)
+            self.assertEqual(
+                [_yltr.odict for _yltr in _template.render_many(iter(_contexts), processes=2, chunksize=2)],
+                _expected)
+            # rendering leaves the template as it was
+            self.assertEqual(_template.odict['name'], '))tenant')
+
+    @debug_on(Exception)
+    def test_lazy_config_attrs(self):
+        _resolved = []
+
+        class _Config(YAMLator):
+            PORT = None
+
+            def _resolve_config_attrs(self):
+                if self._config_attrs_pending is not None:
+                    _resolved.append(self)
+                super()._resolve_config_attrs()
+
+        _test_odict = OrderedDict(
+            port='8080',
+            server=OrderedDict(host='localhost'),
+            **{'use-debug': 'y'}
+        )
+        _cfg = _Config(deepcopy(_test_odict))
+        _cfg.set_config_attrs()
+        self.assertEqual(len(_resolved), 0)
+        self.assertEqual(_cfg.PORT, '8080')
+        self.assertFalse(hasattr(_cfg, 'HOST'))
+        self.assertEqual(len(_resolved), 1)
+
+        # getting a subtree does not traverse it
+        _cfg.get('server/')
+        self.assertEqual(len(_resolved), 1)
+
+        # an edit through the instance is seen by the next read
+        _cfg.get('port', '9090')
+        self.assertEqual(_cfg.PORT, '9090')
+        self.assertEqual(len(_resolved), 2)
+
+        _cfg.set_config_attrs(set_all=True)
+        self.assertEqual(_cfg.HOST, 'localhost')
+        self.assertIs(_cfg.USE_DEBUG, True)
+        self.assertEqual(_Config.PORT, None)
+
     @debug_on(Exception)
     def test_hierarchical_ifs(self):
         _tests_yaml = self.tests_dir.joinpath('hierarchical-ifs.yaml')
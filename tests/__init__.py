@@ -1,6 +1,11 @@
 from yamlgator.tree import *
+from yamlgator.utree import *
 from yamlgator.transformers import *
 from yamlgator.YAMLator import *
+from yamlgator.cache import *
+from yamlgator.profiler import *
+from yamlgator.filecache import *
+from yamlgator.evaluators.AbstractEvaluator import *
 from yamlgator.evaluators.StateEvaluator import *
 from yamlgator.evaluators.Observables import *
 from yamlgator.evaluators.States import *
@@ -9,11 +14,14 @@ from collections import OrderedDict
 from copy import deepcopy
 from importlib import import_module
 
+import os
+import json
 import sys
 import pdb
 import random
 import pathlib
 import tempfile
+import threading
 import unittest
 import functools
 import traceback
@@ -37,6 +37,144 @@ class TestTransformer(unittest.TestCase):
 
             # self._is_confluent_with(_test_tree.get('input/').copy(), _output_tree,list(map(lambda x:getattr(globals().get(x),'name'),_transformer_class_names)))
 
+    @debug_on(Exception)
+    def test_tokenize(self):
+        '''tokenize every key and value of the test docs as tokens.json records'''
+        _expressions = set()
+        for _tests_yaml in sorted(self.tests_dir.rglob('*.yaml')):
+            with _tests_yaml.open('r') as f:
+                _tests_tree = Tree.load(f)
+            if not isinstance(_tests_tree.odict, OrderedDict):
+                continue
+            for _keychain, _value, _is_branch in _tests_tree._iter_nodes():
+                _expressions.add(str(_keychain[-1]))
+                if not _is_branch:
+                    for _item in (_value if isinstance(_value, list) else [_value]):
+                        _expressions.add(str(_item))
+                        _expressions.update(str(_item).split('\n'))
+
+        # only the expressions that are not a single token are recorded
+        _golden_json = pathlib.Path(__file__).absolute().parent.joinpath('tokens.json')
+        _golden = json.loads(_golden_json.read_text())
+        for _transformer_class_name, _tokens in _golden.items():
+            _transformer = globals().get(_transformer_class_name)(Tree(OrderedDict()))
+            for _expression in sorted(_expressions):
+                self.assertEqual(_transformer._tokenize(_expression), _tokens.get(_expression, [_expression]),
+                                 f'{_transformer_class_name}: {_expression!r}')
+
+    @debug_on(Exception)
+    def test_literal_prefilter(self):
+        _tree = Tree(OrderedDict(a='A', b='))a', c=['C', 'D'], d=5, e='x/' * ValueTransformer.max_tokens))
+        _values = ValueTransformer(_tree)
+        self.assertTrue(_values._is_literal('A'))
+        self.assertTrue(_values._is_literal(['C', 'D']))
+        self.assertFalse(_values._is_literal('))a'))
+        self.assertFalse(_values._is_literal(['C\nD']))
+        self.assertFalse(_values._is_literal(5))
+        # however long, a line without a token is left as it is
+        self.assertTrue(_values._is_literal(_tree.odict['e']))
+        # an at transformer has nothing to do with a keychain reference
+        self.assertTrue(AtTransformer(_tree)._is_literal('))a'))
+        self.assertFalse(AtTransformer(_tree)._is_literal('))@'))
+        self.assertTrue(YAMLTransformer(_tree, root_dir=self.tests_dir)._is_literal('./a.yaml'))
+
+        # only the values a token changed are written back
+        _tree.cache_fingerprints()
+        ValueTransformer(_tree).evaluate()
+        self.assertEqual(_tree.odict, OrderedDict(a='A', b='A', c=['C', 'D'], d='5', e=_tree.odict['e']))
+        self.assertEqual(_tree._fingerprints.clear_dirty(), [('b',), ('d',)])
+
+    @debug_on(Exception)
+    def test_circular_substitution(self):
+        # the circular-subs input of validators/test-docs/issues.yaml; before the
+        # tokenizer was iterative, such documents ran out of stack with a RecursionError
+        _odict = OrderedDict((
+            ('service-a', OrderedDict(endpoint='https://api.example.com/)){service-b/path}')),
+            ('service-b', OrderedDict(path='v2/data/)){service-c/assets}')),
+            ('service-c', OrderedDict(assets='static/)){service-a/endpoint}'))))
+        for _fused in (False, True):
+            with self.assertRaisesRegex(TransformerException, r'circular substitution'):
+                YAMLator(deepcopy(_odict)).transform(fused=_fused)
+        for _odict in (OrderedDict(a='x/))a'), OrderedDict(a='))b', b='))a')):
+            with self.assertRaisesRegex(TransformerException, r'circular substitution'):
+                YAMLator(_odict).transform()
+
+        # lines with more tokens than a transformer class allows raise too
+        _odict = OrderedDict(a='A', b=' '.join(['))a'] * 20))
+        YAMLator(deepcopy(_odict)).transform()
+        ValueTransformer.max_tokens = 10
+        self.addCleanup(delattr, ValueTransformer, 'max_tokens')
+        with self.assertRaisesRegex(TransformerException, r'more than 10 tokens'):
+            YAMLator(deepcopy(_odict)).transform()
+        # lines without a token are not tokenized, however long
+        _yltr = YAMLator(OrderedDict(a=' '.join(['x'] * 20), b='))a'))
+        _yltr.transform()
+        self.assertEqual(_yltr.get('/b'), _yltr.get('/a'))
+
+    @debug_on(Exception)
+    def test_token_cache(self):
+        _cache = ValueTransformer.token_cache()
+        # a transformer and its utility tokenize alike
+        self.assertIs(ValueTransformerUtility.token_cache(), _cache)
+        self.assertIsNot(AtTransformer.token_cache(), _cache)
+
+        _values = ValueTransformer(Tree(OrderedDict()))
+        _expression = 'x-))a/b[0]-y'
+        _cache.entries.pop(_expression, None)
+        _hits, _misses = _cache.hits, _cache.misses
+        _tokens = (('x-', None), ('))a/b[0]', ('a/b', '0')), ('-y', None))
+        self.assertEqual(_values._extract_tokens(_expression), _tokens)
+        self.assertEqual(_values._extract_tokens(_expression), _tokens)
+        self.assertEqual((_cache.hits - _hits, _cache.misses - _misses), (1, 1))
+        self.assertGreater(_cache.hit_rate, 0.0)
+
+        # the validators tokenize through it too
+        _yltr = YAMLator(OrderedDict(a='A', b=_expression))
+        _hits = _cache.hits
+        self.assertEqual(_yltr.transform_values().invert().odict, OrderedDict([(')){a/b}', ['b'])]))
+        self.assertGreaterEqual(_cache.hits - _hits, 1)
+        _hits = _cache.hits
+        self.assertEqual(_yltr.check_subs().odict, OrderedDict(b=_expression))
+        self.assertGreaterEqual(_cache.hits - _hits, 1)
+
+        _cache.resize(1)
+        self.assertEqual(len(_cache.entries), 1)
+        _default_max_entries = TokenCache.default_max_entries
+        try:
+            TokenCache.resize_all(0)
+            self.assertEqual(len(_cache.entries), 0)
+            self.assertEqual(_values._extract_tokens(_expression), _tokens)
+            self.assertEqual(len(_cache.entries), 0)
+        finally:
+            TokenCache.resize_all(_default_max_entries)
+        self.assertEqual(_cache.max_entries, _default_max_entries)
+
+    @debug_on(Exception)
+    def test_tree_substitution(self):
+        _subtree = Tree(OrderedDict(a=1, b=OrderedDict(c=['x', 2]), e=OrderedDict(f=OrderedDict())))
+        # what the YAML text of the subtree parses to
+        self.assertEqual(_subtree._stringified_odict(), Tree.load(io.StringIO(str(_subtree))).odict)
+
+        _tree = Tree(OrderedDict(s=_subtree.odict, r='))s', l=['))s/b/'], m='pre ))s/b/'))
+        _load = Tree.__dict__['_load']
+        _loads = []
+        def _counted_load(cls, stream, *args, **kwargs):
+            _loads.append(stream)
+            return _load.__func__(cls, stream, *args, **kwargs)
+        Tree._load = classmethod(_counted_load)
+        try:
+            ValueTransformer(_tree).evaluate()
+        finally:
+            Tree._load = _load
+        _s = OrderedDict(a='1', b=OrderedDict(c=['x', '2']), e=OrderedDict(f=OrderedDict()))
+        self.assertEqual(_tree.odict, OrderedDict(
+            s=_s,
+            r=OrderedDict(s=OrderedDict(a='1', b=OrderedDict(c=['x', '2']))),
+            l=OrderedDict(c=['x', '2']),
+            m=OrderedDict([('pre c', ['x', '2'])])))
+        # only the line with text around its substitution was parsed
+        self.assertEqual(len(_loads), 1)
+
     @debug_on(Exception)
     def test_key_subs(self):
         _tests_yaml = self.tests_dir.joinpath('key-subs.yaml')
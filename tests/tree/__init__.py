@@ -69,6 +69,11 @@ class TestTree(unittest.TestCase):
 
         self.assertEqual(_test,_result)
 
+        # the pure Python loader gives the same tree
+        with _yaml_path.open('r') as f:
+            self.assertEqual(Tree.load(f, Loader=yaml.BaseLoader), _result)
+        self.assertIs(Tree._loader(yaml.BaseLoader), Tree._loader(yaml.BaseLoader))
+
     @debug_on(Exception)
     def test_get(self):
 
@@ -239,6 +244,79 @@ class TestTree(unittest.TestCase):
             _reverse_keychain_orders
         )
 
+    @debug_on(Exception)
+    def test_visit_keychains(self):
+        # deeper than the recursion limit
+        _depth = sys.getrecursionlimit() + 100
+        _t1 = Tree()
+        _node = _t1.odict
+        for _i in range(_depth):
+            _node['a'] = OrderedDict()
+            _node = _node['a']
+        _node['b'] = 'B'
+
+        _keychains = []
+        def _val(value,keychain):
+            _keychains.append(copy(keychain))
+            self.assertRaises(TypeError,keychain.append,'c')
+        _t1.visit(value_process=_val)
+        self.assertEqual(_keychains,[['a']*_depth + ['b']])
+        self.assertIs(type(_keychains[0]),list)
+
+        # every callback shares a single keychain unless copies are asked for
+        _t2 = self._tree_factory(_test_odict_0)
+        _keychains = []
+        _t2.visit(lambda x,y:_keychains.append(y),lambda x,y:_keychains.append(y),lambda x,y:_keychains.append(y))
+        self.assertEqual(len(set(map(id,_keychains))),1)
+        self.assertEqual(_keychains[0],[])
+
+        _keychains = []
+        _t2.visit(value_process=lambda x,y:_keychains.append(y),copy_keychains=True)
+        self.assertEqual(list(map('/'.join,_keychains)),['a','b/c','b/d/e','b/d/f','b/g','b/h/i','b/h/j'])
+
+        # UTree descends into plain dicts
+        _keychains = []
+        UTree(dict(a=dict(b='AB'),c='C')).visit(value_process=lambda x,y:_keychains.append('/'.join(y)))
+        self.assertEqual(_keychains,['a/b','c'])
+
+    @debug_on(Exception)
+    def test_visit_entry_keychain(self):
+        _t1 = self._tree_factory(_test_odict_0)
+
+        _keychains = []
+        _t1.visit(lambda x,y:_keychains.append('pre:'+'/'.join(y)),
+                  value_process=lambda x,y:_keychains.append('/'.join(y)),entry_keychain='b/d')
+        self.assertEqual(_keychains,['pre:b/d','b/d/e','b/d/f'])
+
+        _keychains = []
+        _t1.visit(value_process=lambda x,y:_keychains.append('/'.join(y)),entry_keychain=['b','x'])
+        self.assertEqual(_keychains,[])
+
+        # a restart goes straight to its entry keychain
+        _keychains = []
+        def _restart(value,keychain):
+            _keychains.append('/'.join(keychain))
+            if keychain == ['a']:
+                raise TreeVisitRestartException('b/h')
+        _t1.visit(value_process=_restart)
+        self.assertEqual(_keychains,['a','b/h/i','b/h/j'])
+
+        # a cursor resumes after the node whose callback raised
+        _keychains = []
+        def _stop(value,keychain):
+            _keychains.append('/'.join(keychain))
+            if keychain[-1] in ('c','f'):
+                raise TreeVisitStopException()
+        _cursor = _t1.cursor('b')
+        while not _cursor.exhausted:
+            try:
+                _cursor.walk(value_process=_stop)
+            except TreeVisitStopException:
+                _keychains.append('stop')
+        self.assertEqual(_keychains,['b/c','stop','b/d/e','b/d/f','stop','b/g','b/h/i','b/h/j'])
+
+        self.assertFalse(_t1.cursor().seek(['a','b']))
+
     def test_keys(self):
         _test_odict = OrderedDict(
             a='A',
@@ -378,6 +456,35 @@ class TestTree(unittest.TestCase):
         self.assertEqual(_test_config_odict.get('config').get('is_updated_cleaned'),_subtree.odict)
         _confirm_yes = _subtree.pop('confirm_yes')
 
+    @debug_on(Exception)
+    def test_pop_in_place(self):
+        _t1 = self._tree_factory(_test_odict_0)
+        _b = _t1.get('b/')
+        _h = _t1.get('b/h/')
+
+        # the key stays where it was
+        self.assertEqual(_t1.pop('d',delete_key=False),Tree(OrderedDict(d=OrderedDict(e='BDE',f='BDF'))))
+        self.assertEqual(list(_t1.get('b/').keys()),['c','d','g','h'])
+        self.assertEqual(_t1.get('/b/d'),'')
+
+        # branches are popped in place, without rebuilding the rest of the tree
+        self.assertEqual(_t1.pop('/b/h/i'),'BHI')
+        self.assertIs(_t1.get('b/').odict,_b.odict)
+        self.assertIs(_t1.get('b/h/').odict,_h.odict)
+
+        # emptied branches are removed with the popped key
+        self.assertEqual(_t1.pop('j'),'BHJ')
+        self.assertEqual(list(_t1.get('b/').keys()),['c','d','g'])
+
+        # a keychain context restricts the search for a relative keychain
+        _t2 = self._tree_factory(OrderedDict(
+            a=OrderedDict(b=OrderedDict(c='ABC')),
+            d=OrderedDict(c='DC'),
+        ))
+        self.assertEqual(_t2.pop('c',keychain_context='d'),'DC')
+        self.assertEqual(_t2.odict,OrderedDict(a=OrderedDict(b=OrderedDict(c='ABC'))))
+        self.assertIsNone(_t2.pop('x'))
+
     @debug_on(Exception)
     def test_get_relative_root(self):
 
@@ -631,6 +738,195 @@ class TestTree(unittest.TestCase):
         self.assertEqual(_keychain,['','c','d','b'])
         self.assertEqual(_value,'CDB')
 
+    @debug_on(Exception)
+    def test_key_index(self):
+        _test_odict = OrderedDict(
+            a=OrderedDict(
+                b='AB'
+            ),
+            b='B',
+            c=OrderedDict(
+                d=OrderedDict(
+                    b='CDB'
+                ),
+                e=OrderedDict(
+                    b='CEB'
+                ),
+            )
+        )
+
+        def _assert_same_dfs(tree):
+            _plain_tree = self._tree_factory(tree.odict)
+            for _key in ('a','b','c','d','e','f','g','c/d/b'):
+                for _context in (None,['c'],['c','e']):
+                    try:
+                        _expected = _plain_tree.dfs(_key,_context)
+                    except KeyError:
+                        self.assertRaises(KeyError,tree.dfs,_key,_context)
+                        continue
+                    self.assertEqual(_expected,tree.dfs(_key,_context))
+
+        _t1 = self._tree_factory(_test_odict)
+        _t1.index_keys()
+        _assert_same_dfs(_t1)
+        # ties between equally deep matches go to the first in document order
+        self.assertEqual(_t1.dfs('b'),(['','c','d','b'],'CDB'))
+
+        _t1.get('/c/d','D')
+        _assert_same_dfs(_t1)
+        self.assertEqual(_t1.dfs('b'),(['','c','e','b'],'CEB'))
+
+        _t1.get('/f/g/b',Tree(OrderedDict(b='FGBB')))
+        _assert_same_dfs(_t1)
+        self.assertEqual(_t1.dfs('b'),(['','f','g','b','b'],'FGBB'))
+
+        _t1.pop('/f/')
+        _assert_same_dfs(_t1)
+
+        _t1.overlay(Tree(OrderedDict(d=OrderedDict(b='CDB'))),'/c')
+        _assert_same_dfs(_t1)
+
+        _t1.reset('c/')
+        _assert_same_dfs(_t1)
+
+        # keys added or moved directly are found, deepest first, once the edit is reported
+        _t1.odict['f'] = OrderedDict(g='FG')
+        _t1._on_invalidate()
+        self.assertEqual(_t1.dfs('g'),(['','f','g'],'FG'))
+        self.assertEqual(_t1.get('g/'),'FG')
+        _t1.odict['h'] = OrderedDict(i=_t1.odict.pop('f'))
+        _t1._on_invalidate(['h'])
+        self.assertEqual(_t1.dfs('g'),(['','h','i','g'],'FG'))
+        _assert_same_dfs(_t1)
+
+        # an evaluator rewriting the keys of its branch in place keeps the index exact
+        class _AddDeeperKey(AbstractEvaluator):
+            def _pre_evaluate(self, node, keychain):
+                if keychain == ['h','i']:
+                    node['j'] = OrderedDict(g='HIJG')
+        _AddDeeperKey(_t1).evaluate()
+        self.assertEqual(_t1.dfs('g'),(['','h','i','j','g'],'HIJG'))
+        _assert_same_dfs(_t1)
+
+        # wrappers of the same odict share the index
+        self.assertIs(Tree(_t1)._key_index,_t1._key_index)
+        _t1.index_keys(False)
+        self.assertIsNone(_t1._key_index)
+
+    @debug_on(Exception)
+    def test_fingerprints(self):
+        _t1 = self._tree_factory(_test_odict_0)
+        _t2 = self._tree_factory(_test_odict_0)
+
+        def _assert_fresh(tree):
+            self.assertEqual(tree.fingerprint(),self._tree_factory(tree.odict).fingerprint())
+
+        self.assertEqual(_t1.fingerprint(),_t2.fingerprint())
+        self.assertEqual(_t1.fingerprint('/b/d'),_t2.fingerprint(['','b','d']))
+        self.assertNotEqual(_t1.fingerprint('/b/d'),_t1.fingerprint('/b/h'))
+        # order matters, as it does to OrderedDict equality
+        self.assertNotEqual(
+            self._tree_factory(OrderedDict(a='1',b='2')).fingerprint(),
+            self._tree_factory(OrderedDict(b='2',a='1')).fingerprint())
+        # so does the type of a leaf
+        self.assertNotEqual(
+            self._tree_factory(OrderedDict(a='1')).fingerprint(),
+            self._tree_factory(OrderedDict(a=1)).fingerprint())
+
+        self.assertRaises(TreeException,_t1.changed_keychains)
+        _t1.cache_fingerprints()
+        _t2.cache_fingerprints()
+        self.assertEqual(_t1,_t2)
+        self.assertEqual(_t1.changed_keychains(),[])
+        # equal digests do not make trees equal
+        _nan_trees = [self._tree_factory(OrderedDict(a=float('nan'))) for _ in range(2)]
+        for _nan_tree in _nan_trees:
+            _nan_tree.cache_fingerprints()
+        self.assertEqual(_nan_trees[0].fingerprint(),_nan_trees[1].fingerprint())
+        self.assertNotEqual(_nan_trees[0],_nan_trees[1])
+
+        _t1.get('/b/d/e','X')
+        _assert_fresh(_t1)
+        self.assertNotEqual(_t1,_t2)
+        _t1.get('/b/d/e','BDE')
+        self.assertEqual(_t1,_t2)
+        self.assertEqual(_t1.changed_keychains(),[['','b','d','e']])
+
+        _t1.get('e','BDE2')
+        _t1.pop('/b/h/i')
+        _t1.overlay(Tree(OrderedDict(x=OrderedDict(y='Y'))),'/b')
+        _assert_fresh(_t1)
+        self.assertEqual(_t1.changed_keychains(),[['','b','d','e'],['','b','h','i'],['','b','x']])
+
+        # edits that bypass get() are reported with _on_invalidate()
+        _t1.odict['b']['g'] = 'G'
+        _t1._on_invalidate(['b'])
+        _assert_fresh(_t1)
+        self.assertEqual(_t1.changed_keychains(),[['','b']])
+
+        _t1.reset()
+        _assert_fresh(_t1)
+        self.assertEqual(_t1.changed_keychains(),[['']])
+
+        # wrappers of the same odict share the fingerprints
+        self.assertIs(Tree(_t1)._fingerprints,_t1._fingerprints)
+        _t1.cache_fingerprints(False)
+        self.assertIsNone(_t1._fingerprints)
+
+    @debug_on(Exception)
+    def test_visit_skip_settled(self):
+        _t1 = self._tree_factory(OrderedDict(
+            a=OrderedDict(b='AB', c='))AC'),
+            d=OrderedDict(e='DE', f=['DF']),
+            g=OrderedDict(h=OrderedDict(i='GHI')),
+        ))
+        _markers = ('))',)
+
+        def _visited():
+            _keychains = []
+            _t1.visit(
+                pre_process=lambda node, keychain: _keychains.append('/'.join(keychain) + '/'),
+                value_process=lambda value, keychain: _keychains.append('/'.join(keychain)),
+                skip_settled=_markers)
+            return _keychains
+
+        # without fingerprints nothing is skipped
+        self.assertEqual(len(_visited()), 10)
+
+        _t1.cache_fingerprints()
+        self.assertEqual(_visited(), ['/', 'a/', 'a/c', 'd/', 'g/', 'g/h/'])
+        self.assertEqual(_visited(), ['/', 'a/', 'a/c'])
+
+        _t1.get('/g/h/j', '))GHJ')
+        _t1.get('/d/f', ['DF', 'D\nF'])
+        self.assertEqual(_visited(), ['/', 'a/', 'a/c', 'd/', 'd/f', 'g/', 'g/h/', 'g/h/j'])
+
+        _t1.get('/a/c', 'AC')
+        _t1.get('/d/f', ['DF'])
+        _t1.pop('/g/h/j')
+        self.assertEqual(_visited(), ['/', 'a/', 'd/', 'g/', 'g/h/'])
+        self.assertEqual(_visited(), [])
+
+    @debug_on(Exception)
+    def test_visit_known_literals(self):
+        _t1 = self._tree_factory(OrderedDict(a=OrderedDict(b='AB', c='))AC', d=['AD'])))
+        _t1.cache_fingerprints()
+        _markers = ('))',)
+        _visited = []
+        _t1.visit(value_process=lambda value, keychain: _visited.append('/'.join(keychain)), skip_settled=_markers)
+        self.assertEqual(_visited, ['a/c'])
+
+        # the literal leaves of the unsettled branch are remembered
+        _, _entry = _t1._fingerprints.locate(['a'])
+        self.assertEqual(_entry[3], {'b': _markers, 'd': _markers})
+
+        # until they are written
+        _t1.get('/a/b', '))AB')
+        self.assertEqual(_entry[3], {'d': _markers})
+        _visited.clear()
+        _t1.visit(value_process=lambda value, keychain: _visited.append('/'.join(keychain)), skip_settled=_markers)
+        self.assertEqual(_visited, ['a/b', 'a/c'])
+
     @debug_on(Exception)
     def test_root_get(self):
         t = self._tree_factory()
@@ -894,6 +1190,42 @@ class TestTree(unittest.TestCase):
 
         self.assertEqual(_base_tree,_result_tree)
 
+    @debug_on(Exception)
+    def test_overlay_merge(self):
+        _base_tree = self._tree_factory(OrderedDict(
+            a='A',
+            b=OrderedDict(c='BC',d='BD'),
+            e=OrderedDict(f='EF'),
+        ))
+        _overlay_tree = self._tree_factory(OrderedDict(
+            b='B',
+            a=OrderedDict(g='AG'),
+            e=OrderedDict(f='EF',h=OrderedDict()),
+            i=OrderedDict(j='IJ'),
+        ))
+
+        # branch replaces scalar, scalar replaces branch, key order is kept
+        # and empty branches are not created
+        self.assertEqual(_base_tree.overlay(_overlay_tree,count_changes=True),3)
+        self.assertEqual(_base_tree.odict,OrderedDict(
+            a=OrderedDict(g='AG'),
+            b='B',
+            e=OrderedDict(f='EF'),
+            i=OrderedDict(j='IJ'),
+        ))
+        self.assertEqual(_base_tree.overlay(_overlay_tree,count_changes=True),0)
+
+        # a relative base keychain
+        self.assertEqual(_base_tree.overlay(Tree(OrderedDict(k='JK')),'i/j',count_changes=True),1)
+        self.assertEqual(_base_tree.get('/i/j/k'),'JK')
+
+        # a falsy value cannot replace a scalar on its keychain
+        self.assertRaises(KeyError,_base_tree.overlay,Tree(OrderedDict(l=0)),'/b')
+
+        # a tree overlaid onto itself
+        _base_tree.overlay(_base_tree,'/m')
+        self.assertEqual(_base_tree.get('/m/i/j/k'),'JK')
+
     @debug_on(Exception)
     def test_is_empty(self):
         _tree = Tree()
@@ -949,6 +1281,30 @@ class TestTree(unittest.TestCase):
         tree.reset('c')
         self.assertEqual(tree.odict, _result_odict)
 
+    @debug_on(Exception)
+    def test_copy(self):
+        _shared_list = ['x','y']
+        _test_odict = OrderedDict(
+            a=OrderedDict(
+                b='AB',
+                c=_shared_list,
+            ),
+            d=_shared_list,
+            e=OrderedDict(f=None),
+        )
+        _t1 = self._tree_factory(_test_odict)
+        _t2 = _t1.copy()
+        self.assertEqual(_t1,_t2)
+        self.assertIsNot(_t1.odict['a'],_t2.odict['a'])
+        self.assertIsNot(_t1.odict['a']['c'],_t2.odict['a']['c'])
+        # aliased values stay aliased, as with deepcopy
+        self.assertIs(_t2.odict['a']['c'],_t2.odict['d'])
+
+        _t2.get('/a/b','AB2')
+        _t2.odict['d'].append('z')
+        self.assertEqual(_t1.get('/a/b'),'AB')
+        self.assertEqual(_t1.get('/d/'),['x','y'])
+
     def test_uget(self):
         tree = self._tree_factory(_test_odict_0)
 
@@ -1036,6 +1392,58 @@ class TestTree(unittest.TestCase):
         ]
         self.assertEqual(relative_flattened, expected_relative)
 
+    @debug_on(Exception)
+    def test_iter_flatten(self):
+        tree = self._tree_factory(_test_odict_0)
+
+        _iter = tree.iter_flatten()
+        self.assertEqual(next(_iter), (['', 'a'], 'A'))
+        self.assertEqual(list(_iter), tree.flatten()[1:])
+
+        self.assertEqual(
+            list(tree.iter_flatten(relative=True, prefix='b/d')),
+            [(['b', 'd', 'e'], 'BDE'), (['b', 'd', 'f'], 'BDF')])
+        self.assertEqual(list(tree.iter_flatten(prefix='/b/c')), [(['', 'b', 'c'], 'BC')])
+        self.assertEqual(list(tree.iter_flatten(prefix='x')), [])
+
+        # branches at max_depth are yielded as values
+        self.assertEqual(
+            list(tree.iter_flatten(relative=True, prefix='b', max_depth=1)),
+            [(['b', 'c'], 'BC'), (['b', 'd'], _test_odict_0['b']['d']), (['b', 'g'], 'BG'), (['b', 'h'], _test_odict_0['b']['h'])])
+
+        self.assertEqual(
+            list(map('/'.join, tree.iter_keys(relative=True))),
+            ['a', 'b', 'b/c', 'b/d', 'b/d/e', 'b/d/f', 'b/g', 'b/h', 'b/h/i', 'b/h/j'])
+        self.assertEqual(list(tree.iter_leaves(prefix='b/h')), ['BHI', 'BHJ'])
+        self.assertEqual(
+            [(_keychain, list(_branch.keys())) for _keychain, _branch in tree.iter_branches()],
+            [(['', 'b'], ['c', 'd', 'g', 'h']), (['', 'b', 'd'], ['e', 'f']), (['', 'b', 'h'], ['i', 'j'])])
+
+    @debug_on(Exception)
+    def test_dump(self):
+        _shared = OrderedDict([('x', 1)])
+        tree = self._tree_factory(OrderedDict([
+            ('a', 1), ('b', b'B'), ('c', [1, 2]), ('d', OrderedDict([('e', OrderedDict())])),
+            ('f', _shared), ('g', _shared)]))
+        _expected = "a: '1'\nb: B\nc:\n- '1'\n- '2'\nf:\n  x: '1'\ng:\n  x: '1'\n"
+
+        self.assertEqual(tree.dump(), _expected)
+        self.assertEqual(tree.dump(Dumper=yaml.Dumper), _expected)
+        self.assertEqual(tree.dump(), tree.stringify().dump(Dumper=yaml.Dumper))
+
+        _stream = io.StringIO()
+        self.assertIsNone(tree.dump(_stream))
+        self.assertEqual(_stream.getvalue(), _expected)
+
+        # str() folds long double-quoted scalars as it always has; tree substitutions splice it in
+        tree = self._tree_factory(OrderedDict(a=OrderedDict(b=(
+            'emerge --ask=n --verbose --noreplace --oneshot --update --deep --newuse sys-apps/portage '
+            '\n\tsys-devel/gcc app-editors/vim --keep-going --jobs=4'))))
+        self.assertEqual(str(tree), (
+            'a:\n  b: "emerge --ask=n --verbose --noreplace --oneshot --update --deep --newuse sys-apps/portage\\\n'
+            '    \\ \\n\\tsys-devel/gcc app-editors/vim --keep-going --jobs=4"\n'))
+        self.assertEqual(Tree.load(io.StringIO(tree.dump(Dumper=FAST_DUMPER))).odict, tree.odict)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -52,5 +52,23 @@ class TestValidator(unittest.TestCase):
             else:
                 print(f'skipping validation of issues:{_test_name}')
 
+    @debug_on(Exception)
+    def test_schedule(self):
+        _yltr = YAMLator(Tree.load(io.StringIO(
+            "url: 'http://))host:))port'\n"
+            "host: ))domain\n"
+            "port: '80'\n"
+            "domain: example.org\n"
+            "server:\n"
+            "  name: ))host\n"
+            "copy: ))server\n")))
+        _keychains, _passes = _yltr.transform_values().schedule()
+        for _keychain, _dependency in ((['url'], ['host']), (['server', 'name'], ['host']), (['copy'], ['server', 'name'])):
+            self.assertLess(_keychains.index(_dependency), _keychains.index(_keychain))
+        self.assertEqual(_passes, 2)
+
+        _yltr = YAMLator(Tree.load(io.StringIO("a: ))b\nb: ))c\nc: ))a\n")))
+        self.assertIsNone(_yltr.transform_values().schedule())
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,17 @@
+import collections
+import contextlib
+import functools
+import time
+import concurrent.futures
+import itertools
+
 from .tree import *
 from .transformers import *
+from .transformers.PathValueTransformer import PathValueTransformer
 from .objdb import *
+from .profiler import TransformProfile
+from .filecache import ParsedFileCache
+from .evaluators.FusedEvaluator import FusedEvaluator
 from .constants import *
 
 
@@ -28,17 +39,109 @@ class YAMLatorException(Exception):
     pass
 
 
+class TransformBudgetException(YAMLatorException):
+    """Raised when YAMLator.transform() runs out of passes or time.
+
+    The transform stops after the pass that used up the budget, leaving the
+    document as that pass left it.
+
+    Attributes:
+        tree (YAMLator): The partially transformed document.
+        passes (int): The passes run.
+        changed_keychains (list[list[str]]): The topmost keychains the last
+            pass edited, each starting with the root ''.
+        report (TransformReport): The report so far.
+    """
+    def __init__(self, msg, tree, passes, changed_keychains, report):
+        super().__init__(msg)
+        self.tree = tree
+        self.passes = passes
+        self.changed_keychains = changed_keychains
+        self.report = report
+
+
+class _KeyTypeClassifier:
+    """The key-type regexes of a YAMLatorObjectDB compiled into one pattern.
+
+    Each regex becomes an optional lookahead with a named group of its own, so
+    a single match at the start of a key reports every key type whose regex
+    `re.match`es the key. Regexes with capturing groups of their own are
+    matched one by one, since their group numbers would shift.
+
+    Args:
+        regexes (dict): The key-type regexes by key type.
+    """
+    # keys classified before the memo is cleared
+    MEMO_SIZE = 4096
+
+    def __init__(self, regexes):
+        self.key_types = tuple(regexes.keys())
+        self.memo = {}
+        if all(re.compile(_regex).groups == 0 for _regex in regexes.values()):
+            self.pattern = re.compile(''.join(
+                f'(?:(?=(?P<_{_i}>{_regex})))?' for _i, _regex in enumerate(regexes.values())))
+        else:
+            self.pattern = None
+            self.regexes = tuple(regexes.items())
+
+    def __call__(self, key):
+        try:
+            return self.memo[key]
+        except KeyError:
+            pass
+        if self.pattern is not None:
+            _matched = [self.key_types[_i] for _i, _group in enumerate(self.pattern.match(key).groups())
+                        if _group is not None]
+        else:
+            _matched = [_key_type for _key_type, _regex in self.regexes if re.match(_regex, key)]
+        if len(_matched) > 1:
+            raise YAMLatorException('we matched two keys types for one key!')
+        _key_type = _matched[0] if _matched else None
+        if len(self.memo) >= self.MEMO_SIZE:
+            self.memo.clear()
+        self.memo[key] = _key_type
+        return _key_type
+
+
+# _KeyTypeClassifier instances by their (key type, regex) items; every
+# YAMLator registers the same default key types
+_KEY_TYPE_CLASSIFIERS = {}
+
+
+@dataclass
+class TransformReport:
+    """What a YAMLator.transform() call did."""
+    # passes of the fixed-point loop, the last of which changed nothing
+    passes: int = 0
+    # keychains whose variables were substituted in dependency order first
+    scheduled: int = 0
+    # passes the loop would otherwise have spent on the variable chains, as
+    # AbstractValidator.schedule() estimates them; they are not run to count them
+    passes_saved: int = 0
+    # what each utility did in each pass, with profile=True
+    profile: typing.Optional[TransformProfile] = None
+
+
 class YAMLatorObjectDB(ObjectDB):
-    regexes = None
+    # replaced rather than updated, so the class and each customised
+    # instance see their own copy
+    regexes = {}
+    _key_type_classifier = None
 
     def __init__(self):
         super().__init__()
-        self.regexes = {}
 
 
     def add_object(self, key_type, key_type_regex, constructor, *args, **kwargs):
         self._register(key_type, constructor, *args, **kwargs)
-        self.regexes[key_type] = key_type_regex
+        self.regexes = {**self.regexes, key_type: key_type_regex}
+        self._key_type_classifier = None
+
+    @classmethod
+    def add_shared_object(cls, key_type, key_type_regex, constructor, *args, **kwargs):
+        """Like add_object, for every instance of the class and its subclasses."""
+        cls._register_shared(key_type, constructor, *args, **kwargs)
+        cls.regexes = {**cls.regexes, key_type: key_type_regex}
 
     def get_object(self,key,value):
         try:
@@ -58,18 +161,41 @@ class YAMLatorObjectDB(ObjectDB):
         return list(self.regexes.keys())
 
     def key_type(self,key):
-        _key_type = None
-        for __key_type, _regex in self.regexes.items():
-            _m = re.match(_regex, key)
-            if _m:
-                if _key_type is not None and _key_type != __key_type:
-                    raise YAMLatorException('we matched two keys types for one key!')
-                _key_type = __key_type
-        return _key_type
+        _classifier = self._key_type_classifier
+        if _classifier is None:
+            _items = tuple(self.regexes.items())
+            _classifier = _KEY_TYPE_CLASSIFIERS.get(_items)
+            if _classifier is None:
+                _classifier = _KEY_TYPE_CLASSIFIERS[_items] = _KeyTypeClassifier(self.regexes)
+            self._key_type_classifier = _classifier
+        return _classifier(key)
 
     def register(self,object_class,attribute_name,*args,**kwargs):
         self._register(attribute_name,object_class,self,*args,**kwargs)
 
+    @classmethod
+    def register_shared(cls,object_class,attribute_name,*args,**kwargs):
+        """Like register, for every instance of the class and its subclasses."""
+        cls._register_shared(attribute_name,object_class,*args,bind=True,**kwargs)
+
+class _ConfigAttr:
+    """An uppercase class attribute of a YAMLator subclass.
+
+    Reading it on an instance first resolves the instance's pending config
+    attributes, which are stored in the instance `__dict__` and so shadow
+    this descriptor from then on.
+    """
+    def __init__(self, name, default):
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        instance._resolve_config_attrs()
+        return instance.__dict__.get(self.name, self.default)
+
+
 class YAMLator(YAMLatorObjectDB, Tree):
     """A powerful, high-level configuration processing engine.
 
@@ -101,8 +227,29 @@ class YAMLator(YAMLatorObjectDB, Tree):
             configuration values.
     """
 
+    # set_all of the pending set_config_attrs() call, None if none is pending
+    _config_attrs_pending = None
+    # set_all of the last set_config_attrs() call
+    _config_attrs_set_all = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # config attributes declared on the class are resolved when first read
+        for _name, _value in list(vars(cls).items()):
+            if _name == _name.upper() and not _name.startswith('_') and not hasattr(_value, '__get__'):
+                setattr(cls, _name, _ConfigAttr(_name, _value))
+
+    def __getattr__(self, name):
+        # undeclared config attributes from set_config_attrs(set_all=True)
+        if name == name.upper() and not name.startswith('_') \
+                and self.__dict__.get('_config_attrs_pending') is not None:
+            self._resolve_config_attrs()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     @classmethod
-    def load(cls, stream):
+    def load(cls, stream, Loader=DEFAULT_LOADER):
         """A class method factory for creating a new YAMLator instance from a stream.
 
         This method overrides the parent `Tree.load` method. Its primary purpose
@@ -118,6 +265,8 @@ class YAMLator(YAMLatorObjectDB, Tree):
             stream (file-like object or io.StringIO): The source of the YAML
                 data. This can be a file-like object (from an open file) or
                 an `io.StringIO` instance for in-memory YAML content.
+            Loader (yaml.BaseLoader): The loader class passed on to
+                `Tree.load`.
 
         Returns:
             YAMLator: A new `YAMLator` instance, initialized with the parsed
@@ -128,7 +277,7 @@ class YAMLator(YAMLatorObjectDB, Tree):
         else:
             _root_dir = str(pathlib.Path(stream.name).parent)
         # return YAMLator(cls._load(stream),_root_dir)
-        return cls(cls._load(stream),_root_dir)
+        return cls(cls._load(stream,Loader),_root_dir)
 
 
     def __init__(self, odict_or_yamlator_or_tree=None, root_dir=None):
@@ -159,18 +308,26 @@ class YAMLator(YAMLatorObjectDB, Tree):
         else:
             root_dir = pathlib.Path('.') if root_dir is None else root_dir
             self.root_dir = pathlib.Path(root_dir).absolute()
+        # the default key types and utilities are registered on the class at the end of the module
 
-        # ensure custom objdb has the default types
-        for _key_type, _data in DEFAULT_KEY_TYPES.items():
-            _key_regex, _object_constructor_data = _data
-            self.add_object(_key_type, _key_regex, *_object_constructor_data)
 
-        # register the default utilities
-        for _attribute_name,_transformer_class in DEFAULT_UTILITIES.items():
-            self.register(_transformer_class,_attribute_name)
+    def _tracks_edits(self):
+        return self._config_attrs_set_all is not None or super()._tracks_edits()
 
+    def _on_insert(self, keychain, value):
+        super()._on_insert(keychain, value)
+        self._unresolve_config_attrs()
 
-    def transform(self,methods=None,context_tree=None,allow_tree_subs=True):
+    def _on_remove(self, keychain, value):
+        super()._on_remove(keychain, value)
+        self._unresolve_config_attrs()
+
+    def _on_invalidate(self, keychain=None):
+        super()._on_invalidate(keychain)
+        self._unresolve_config_attrs()
+
+    def transform(self,methods=None,context_tree=None,allow_tree_subs=True,dependency_order=False,profile=False,
+                  max_passes=None,timeout=None,fused=False,read_paths=None):
         """The main processing engine for the YAMLator object.
 
         This method repeatedly applies a suite of transformation utilities to the
@@ -193,9 +350,37 @@ class YAMLator(YAMLatorObjectDB, Tree):
             allow_tree_subs (bool, optional): A boolean flag passed to the
                 transformers to enable or disable a specific substitution
                 feature. Defaults to False.
+            dependency_order (bool, optional): Substitute the `))key`
+                variables in the order of their dependencies (see
+                `AbstractValidator.schedule`) before the loop, so chains of
+                variables do not cost a pass per link. Imports, if-keys, bangs
+                and circular or external references are still left to the
+                loop. Defaults to False.
+            profile (bool, optional): Time and count what each utility does in
+                each pass (see `TransformProfile`). Defaults to False.
+            max_passes (int, optional): The most passes to run, counting the
+                last one, which changes nothing. Defaults to None, no limit.
+            timeout (float, optional): The seconds after which no further pass
+                is started. A pass already running is not interrupted. Defaults
+                to None, no limit.
+            fused (bool, optional): Find the nodes each utility could change in
+                one walk per pass and run only the utilities that have any,
+                the ones that only write the leaf they evaluate on just those
+                leaves (see `FusedEvaluator`). The utilities still run in order
+                and the result is the same. Defaults to False.
+            read_paths (list, optional): A list every path the path selectors
+                and imports of the transform try to read is appended to, found
+                or not. Defaults to None.
 
         Returns:
-            None: The method modifies the YAMLator instance in-place.
+            TransformReport: The passes run, with dependency_order the
+                keychains scheduled and an estimate of the passes that saved
+                the loop, and with profile the TransformProfile. The method modifies the YAMLator
+                instance in-place.
+
+        Raises:
+            TransformBudgetException: If the document is still changing when
+                max_passes or timeout run out.
         """
         # apply all default utilities until no more change in self.odict
         methods = methods if methods is not None else tuple(DEFAULT_UTILITIES.keys())
@@ -208,18 +393,154 @@ class YAMLator(YAMLatorObjectDB, Tree):
             if _DEBUG.TRANSFORM:
                 ic(_methods[-1]().name)
 
-        _old_odict = self.copy().odict
-        if _DEBUG.TRANSFORM:
-            ic(self.odict)
-        for _method_utility in _methods:
-            _method_utility(context_tree=context_tree, allow_tree_subs=allow_tree_subs).evaluate()
-
-        while self.odict != _old_odict:
+        # the utilities share this tree's key index, so relative lookups
+        # during the transform do not visit the whole tree, and its
+        # fingerprints, so a pass that changed nothing is spotted without
+        # snapshotting and comparing the whole tree; the last pass is
+        # confirmed with a fresh digest (see AbstractEvaluator)
+        _index_keys = self._key_index is None
+        if _index_keys:
+            self.index_keys()
+        _cache_fingerprints = self._fingerprints is None
+        if _cache_fingerprints:
+            self.cache_fingerprints()
+
+        # nodes free of every utility's markers can not change any more, so
+        # each utility only walks the nodes that still hold one or that were
+        # edited since a walk found them settled; a utility that does not
+        # declare its markers makes every walk a full one
+        _settle_markers = self._fingerprints.settle_markers
+        _markers = [getattr(getattr(_method_utility,'_function',None),'markers',None) for _method_utility in _methods]
+        if _settle_markers is None and None not in _markers:
+            self._fingerprints.settle_markers = tuple(sorted(set(_marker for _utility_markers in _markers for _marker in _utility_markers)))
+
+        _report = TransformReport(profile=TransformProfile() if profile else None)
+        _profile = _report.profile
+        _budgeted = max_passes is not None or timeout is not None
+        _deadline = time.monotonic() + timeout if timeout is not None else None
+        # without an active file cache, each file is parsed once per transform
+        _file_cache = ParsedFileCache.current()
+        if _file_cache is None:
+            _file_cache = ParsedFileCache()
+        if read_paths is None and _profile is not None:
+            # the profile counts the files each utility reads
+            read_paths = []
+        # the utilities that read files are made with the file cache and read_paths
+        _factories = [
+            functools.partial(_method_utility, context_tree=context_tree, allow_tree_subs=allow_tree_subs,
+                              **(dict(file_cache=_file_cache, read_paths=read_paths)
+                                 if self._reads_files(_method_utility) else {}))
+            for _method_utility in _methods]
+        try:
+            if dependency_order and context_tree is None and ValueTransformerUtility.name in methods:
+                self._transform_in_dependency_order(_report, allow_tree_subs)
+
+            if fused:
+                _fused = FusedEvaluator(self, [
+                    (_method, getattr(_method_utility, '_function', None), _factory)
+                    for _method, _method_utility, _factory in zip(methods, _methods, _factories)], profile=_profile)
+
+            _old_fingerprint = None
+            _fingerprint = self.fingerprint()
+            while _fingerprint != _old_fingerprint:
+                if _DEBUG.TRANSFORM:
+                    ic(self.odict)
+                _old_fingerprint = _fingerprint
+                if _budgeted:
+                    # the edits of this pass alone, to report if it is the last one
+                    _dirty = self._fingerprints.dirty
+                    self._fingerprints.dirty = set()
+                if fused:
+                    _fused.evaluate(_report.passes + 1)
+                else:
+                    for _method, _factory in zip(methods, _factories):
+                        _utility = _factory()
+                        if _profile is None:
+                            _utility.evaluate()
+                        else:
+                            _profile.evaluate(_utility, _method, _report.passes + 1)
+                _fingerprint = self.fingerprint()
+                if _fingerprint == _old_fingerprint and not self._confirm_fingerprint(_fingerprint):
+                    # a utility edited the tree directly; its digest, made afresh, differs
+                    _fingerprint = self.fingerprint()
+                _report.passes += 1
+                if _budgeted:
+                    _pass_dirty = self._fingerprints.dirty
+                    self._fingerprints.dirty = _dirty | _pass_dirty
+                    if _fingerprint != _old_fingerprint:
+                        self._check_budget(_report, max_passes, _deadline, _pass_dirty)
+            # passes the loop still needed for everything else are not saved
+            _report.passes_saved = max(0, _report.passes_saved - _report.passes)
             if _DEBUG.TRANSFORM:
-                ic(self.odict)
-            _old_odict = self.copy().odict
-            for _method_utility in _methods:
-                _method_utility(context_tree=context_tree, allow_tree_subs=allow_tree_subs).evaluate()
+                ic(_report)
+            return _report
+        finally:
+            # the utilities edited the tree through their own wrappers
+            self._unresolve_config_attrs()
+            self._fingerprints.settle_markers = _settle_markers
+            if _index_keys:
+                self.index_keys(False)
+            if _cache_fingerprints:
+                self.cache_fingerprints(False)
+
+    @staticmethod
+    def _reads_files(method_utility):
+        _utility_class = getattr(method_utility, '_function', None)
+        return isinstance(_utility_class, type) and issubclass(_utility_class, (PathValueTransformer, ImportTransformer))
+
+    def _confirm_fingerprint(self, fingerprint):
+        # the cached digests miss edits a utility made to the odicts without
+        # _on_invalidate(); a digest of the whole tree made afresh does not
+        if TreeFingerprints(self.odict, self._branch_type).digest().hex() == fingerprint:
+            return True
+        if _DEBUG.TRANSFORM:
+            _msg = 'the tree was edited without invalidating its fingerprints'
+            ic(_msg)
+        self._on_invalidate()
+        return False
+
+    def _check_budget(self, report, max_passes, deadline, pass_dirty):
+        if max_passes is not None and report.passes >= max_passes:
+            _msg = f'still changing after {report.passes} passes'
+        elif deadline is not None and time.monotonic() >= deadline:
+            _msg = f'still changing when the timeout ran out, after {report.passes} passes'
+        else:
+            return
+        _changed_keychains = [[''] + list(_keychain) for _keychain in TreeFingerprints.topmost(pass_dirty)]
+        if _DEBUG.TRANSFORM:
+            ic(_msg)
+            ic(_changed_keychains)
+        raise TransformBudgetException(_msg, self, report.passes, _changed_keychains, report)
+
+    def _transform_in_dependency_order(self, report, allow_tree_subs):
+        # one value substitution per keychain of the schedule, so each sees its dependencies resolved
+        _values = getattr(self, ValueTransformerUtility.name)(allow_tree_subs=allow_tree_subs)
+        _schedule = _values.schedule()
+        if _schedule is None:
+            # circular dependencies are left to the loop
+            return
+        _keychains, _passes = _schedule
+        _fingerprint = self.fingerprint()
+        with report.profile.instrument(_values, ValueTransformerUtility.name, 0) \
+                if report.profile is not None else contextlib.nullcontext():
+            self._evaluate_schedule(_values, _keychains, report)
+        # the loop would have spent these passes on the chains, and one more to see nothing change
+        if self.fingerprint() != _fingerprint:
+            report.passes_saved = _passes + 1
+
+    def _evaluate_schedule(self, values, keychains, report):
+        for _keychain in keychains:
+            # an earlier substitution may have replaced the leaf with a branch or moved it
+            _value = self.odict
+            for _key in _keychain:
+                if not isinstance(_value, self._branch_type) or _key not in _value:
+                    _value = None
+                    break
+                _value = _value[_key]
+            if _value is None or isinstance(_value, self._branch_type):
+                continue
+            values._value_evaluate(_value, _keychain)
+            report.scheduled += 1
 
     def get(self,keychain_or_keychain_str,value=None):
         """
@@ -246,13 +567,28 @@ class YAMLator(YAMLatorObjectDB, Tree):
     def copy(self):
         """Copies the YAMLator object.
 
+        As with `Tree.copy`, every branch is rebuilt and only immutable leaves
+        are shared with the original.
+
         Returns:
              YAMLator: A deepcopy of the YAMLator object.
         """
-        _yt = YAMLator(deepcopy(self.odict), root_dir=self.root_dir)
+        _yt = YAMLator(self._copy_odict(), root_dir=self.root_dir)
         _yt.set_config_attrs()
         return _yt
 
+    def compile(self, methods=None, allow_tree_subs=True):
+        """Prepares the document to be rendered against many context trees.
+
+        Args:
+            methods (list[str], optional): As for `transform`.
+            allow_tree_subs (bool, optional): As for `transform`.
+
+        Returns:
+            CompiledTemplate: The template; see its `render` and `render_many`.
+        """
+        return CompiledTemplate(self, methods, allow_tree_subs)
+
     def merge(self, yaml_path_selector, keychain_str=None, relative=False):
         """Merges data from an external YAML file into the current instance.
 
@@ -321,7 +657,8 @@ class YAMLator(YAMLatorObjectDB, Tree):
                     _merge_data=f'./{_yaml_path.name}#{_selector}'
                 ),
                 root_dir=_root_dir
-            )
+            ),
+            file_cache=ParsedFileCache.current()
         )
 
         # notice: no transforms are done on the file to be merged
@@ -351,9 +688,31 @@ class YAMLator(YAMLatorObjectDB, Tree):
                   every key found in the YAML data, regardless of whether it
                   was pre-defined.
 
+        The attributes are resolved lazily: the tree is only traversed when
+        one of them is first read, and again on the first read after the tree
+        was edited through this instance or transformed.
+
         Returns:
             None: The method modifies the instance in-place.
         """
+        self._config_attrs_set_all = set_all
+        self._unresolve_config_attrs()
+
+    def _unresolve_config_attrs(self):
+        # drop the resolved values that are still in place; the next read resolves them again
+        if self._config_attrs_set_all is None:
+            return
+        for _attr_name, _object_value in self.__dict__.pop('_config_attrs', {}).items():
+            if _attr_name in self.__dict__ and self.__dict__[_attr_name] is _object_value:
+                del self.__dict__[_attr_name]
+        self._config_attrs_pending = self._config_attrs_set_all
+
+    def _resolve_config_attrs(self):
+        set_all = self._config_attrs_pending
+        if set_all is None:
+            return
+        self._config_attrs_pending = None
+        self._config_attrs = _config_attrs = {}
         _is_already_set = dict()
 
         def _depth_first(_node,_keychain):
@@ -369,7 +728,8 @@ class YAMLator(YAMLatorObjectDB, Tree):
                 if _attr_name.startswith('_'):
                     _attr_name = _attr_name[1:]
 
-                if hasattr(self,_attr_name) or set_all:
+                # not hasattr(self,...), which would come back here through __getattr__
+                if _attr_name in self.__dict__ or hasattr(type(self),_attr_name) or set_all:
                     if _is_already_set.get(_attr_name,False):
                         if _DEBUG.CONFIG_ATTRS:
                             _msg = f'{_attr_name} already set'
@@ -416,6 +776,7 @@ class YAMLator(YAMLatorObjectDB, Tree):
                     if _DEBUG.CONFIG_ATTRS:
                         ic(_object_value)
                     setattr(self, _attr_name, _object_value)
+                    _config_attrs[_attr_name] = _object_value
                     _is_already_set[_attr_name] = True
 
         # we set objects on demand with a special object getter
@@ -441,6 +802,7 @@ class YAMLator(YAMLatorObjectDB, Tree):
             {'SERVER_HOST': 'localhost', 'SERVER_PORT': '8080'}
 
         """
+        self._resolve_config_attrs()
         _data = {}
         for _config_datum in list(filter(lambda x:x == x.upper() and not x.startswith('_'),self.__dir__())):
             _data.update({_config_datum:str(getattr(self,_config_datum))})
@@ -475,6 +837,7 @@ class YAMLator(YAMLatorObjectDB, Tree):
 
     def check_subs(self):
         _unsubbed = Tree()
+        _value_transformer = ValueTransformer()
 
         def _assert_not_unsubbed(value,keychain):
             if not isinstance(value,list):
@@ -484,9 +847,170 @@ class YAMLator(YAMLatorObjectDB, Tree):
             for _value in _values:
                 ic(_value)
                 if type(_value) is str:
-                    _tokens = ValueTransformer()._tokenize(_value)
+                    _tokens = [_token for _token, _groups in _value_transformer._extract_tokens(_value)]
                     if any(list(map(lambda x:is_variable_token(x),_tokens))):
                         _unsubbed.get(keychain,value)
 
         self.visit(value_process=_assert_not_unsubbed)
         return _unsubbed
+
+
+class CompiledTemplate:
+    """A YAMLator document prepared once to be rendered against many contexts.
+
+    Rendering is `transform(context_tree=...)` on a copy of the document, but
+    the work that does not depend on the context is done once, here:
+
+        - The document is parsed and copied once; each render copies only its
+          branches and shares the string leaves.
+        - Path selectors free of variables (`./file.yaml#key`, plain text
+          files) are read and substituted once.
+        - The values and keys still holding a utility's markers are found once
+          (`holes`). Everything else is literal, and a render's transform walks
+          past it without tokenizing it.
+
+    With a context tree, `))key` variables are looked up in the context only,
+    so every value holding one is a hole.
+
+    Args:
+        yamlator (YAMLator): The template. It is copied, not modified.
+        methods (list[str], optional): The utilities to transform with, as for
+            `YAMLator.transform`. Defaults to all default utilities.
+        allow_tree_subs (bool, optional): As for `YAMLator.transform`.
+            Defaults to True.
+
+    Examples:
+        >>> template = YAMLator.load(open('tenant.yaml')).compile()
+        >>> for tenant_config in template.render_many(tenant_contexts, processes=8):
+        ...     deploy(tenant_config)
+    """
+    def __init__(self, yamlator, methods=None, allow_tree_subs=True):
+        self.yamlator_class = type(yamlator)
+        self.root_dir = yamlator.root_dir
+        self.methods = tuple(methods if methods is not None else DEFAULT_UTILITIES.keys())
+        self.allow_tree_subs = allow_tree_subs
+
+        _utilities = [getattr(yamlator, _method)._function for _method in self.methods]
+        _markers = [getattr(_utility, 'markers', None) for _utility in _utilities]
+        _compiled = self.yamlator_class(yamlator._copy_odict(), root_dir=self.root_dir)
+        _path_methods = [_method for _method, _utility in zip(self.methods, _utilities)
+                         if issubclass(_utility, PathValueTransformer)]
+        _other_markers = [_utility_markers for _utility_markers, _utility in zip(_markers, _utilities)
+                          if not issubclass(_utility, PathValueTransformer)]
+        if _path_methods and None not in _other_markers:
+            # a value another utility still acts on may read differently once it has, so only
+            # the values free of every other marker are read now; the rest are masked meanwhile
+            _other_markers = tuple(set(_marker for _utility_markers in _other_markers for _marker in _utility_markers))
+            _masked = self._mask(_compiled.odict, _other_markers, {})
+            _compiled.transform(methods=_path_methods, allow_tree_subs=allow_tree_subs)
+            self._unmask(_compiled.odict, _masked)
+        self.odict = _compiled.odict
+
+        # the unmasking bypassed the YAMLator's caches, so a plain Tree is walked
+        _tree = Tree(self.odict)
+        if None in _markers:
+            # a utility that does not declare its markers may act on anything
+            self.holes = [_keychain for _keychain, _value in _tree.iter_flatten(relative=True)]
+        else:
+            _markers = tuple(set(_marker for _utility_markers in _markers for _marker in _utility_markers))
+            self.holes = [
+                _keychain for _keychain, _value, _is_branch in _tree._iter_nodes(relative=True)
+                if any(_marker in str(_keychain[-1]) for _marker in _markers)
+                or not _is_branch and not TreeFingerprints.settled_leaf(_value, _markers)]
+
+    @classmethod
+    def _mask(cls, odict, markers, masked):
+        # replaces, in place, the leaves holding any of markers with placeholders free of them
+        for _key, _value in odict.items():
+            if isinstance(_value, OrderedDict):
+                cls._mask(_value, markers, masked)
+            elif any(_marker in str(_value) for _marker in markers):
+                _placeholder = f'\0masked-{len(masked)}'
+                masked[_placeholder] = _value
+                odict[_key] = _placeholder
+        return masked
+
+    @classmethod
+    def _unmask(cls, odict, masked):
+        for _key, _value in odict.items():
+            if isinstance(_value, OrderedDict):
+                cls._unmask(_value, masked)
+            elif isinstance(_value, str) and _value in masked:
+                odict[_key] = masked[_value]
+
+    def render(self, context_tree=None):
+        """Renders the template against one context.
+
+        Args:
+            context_tree (Tree | OrderedDict, optional): The context the
+                variables are looked up in. Defaults to None, i.e. the
+                document itself.
+
+        Returns:
+            YAMLator: A new, transformed document.
+        """
+        if context_tree is not None and not isinstance(context_tree, Tree):
+            context_tree = Tree(context_tree)
+        _yltr = self.yamlator_class(Tree(self.odict)._copy_odict(), root_dir=self.root_dir)
+        _yltr.transform(methods=self.methods, context_tree=context_tree, allow_tree_subs=self.allow_tree_subs)
+        return _yltr
+
+    def render_many(self, context_trees, processes=None, chunksize=16):
+        """Renders the template against each of many contexts, lazily.
+
+        Args:
+            context_trees (typing.Iterable[Tree | OrderedDict]): The contexts;
+                they are consumed as the results are.
+            processes (int, optional): The number of worker processes to
+                render in. Defaults to None, i.e. rendering in this process.
+            chunksize (int, optional): The number of contexts a worker renders
+                per task. Defaults to 16.
+
+        Yields:
+            YAMLator: The rendered documents, in the order of the contexts.
+        """
+        if not processes:
+            for _context_tree in context_trees:
+                yield self.render(_context_tree)
+            return
+
+        _contexts = iter(context_trees)
+        def _next_chunk():
+            return [_context_tree.odict if isinstance(_context_tree, Tree) else _context_tree
+                    for _context_tree in itertools.islice(_contexts, chunksize)]
+
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_render_worker, initargs=(self,)) as _executor:
+            # a couple of chunks per worker in flight keeps them busy without reading ahead
+            _pending = collections.deque()
+            while True:
+                while len(_pending) < 2 * processes:
+                    _chunk = _next_chunk()
+                    if not _chunk:
+                        break
+                    _pending.append(_executor.submit(_render_in_worker, _chunk))
+                if not _pending:
+                    return
+                for _odict in _pending.popleft().result():
+                    yield self.yamlator_class(_odict, root_dir=self.root_dir)
+
+
+# the CompiledTemplate of a render_many() worker process
+_WORKER_TEMPLATE = None
+
+
+def _init_render_worker(template):
+    global _WORKER_TEMPLATE
+    _WORKER_TEMPLATE = template
+
+
+def _render_in_worker(context_odicts):
+    return [_WORKER_TEMPLATE.render(_context_odict).odict for _context_odict in context_odicts]
+
+
+# the default key types and utilities are shared by every YAMLator; add_object()
+# and register() on an instance still override them for that instance only
+for _key_type, (_key_regex, _object_constructor_data) in DEFAULT_KEY_TYPES.items():
+    YAMLator.add_shared_object(_key_type, _key_regex, *_object_constructor_data)
+for _attribute_name, _transformer_class in DEFAULT_UTILITIES.items():
+    YAMLator.register_shared(_transformer_class, _attribute_name)
@@ -1 +1,5 @@
-from .YAMLator import YAMLator
\ No newline at end of file
+from .YAMLator import YAMLator
+from .cache import TransformCache
+from .profiler import TransformProfile
+from .filecache import ParsedFileCache
+from .transformers.TokenCache import TokenCache
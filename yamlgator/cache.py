@@ -0,0 +1,170 @@
+import os
+import pickle
+import tempfile
+
+from .constants import *
+from .tree import *
+from .YAMLator import YAMLator
+
+
+class _DEBUG:
+    TransformCache = False
+
+
+class TransformCache:
+    """An on-disk cache of transformed YAMLator documents.
+
+    `load()` returns what `YAMLator.load(...).transform()` would, but keeps the
+    transformed tree in `cache_dir` and, as long as none of the files the
+    transform read has changed, loads it from there on later calls instead of
+    transforming again.
+
+    An entry records the size, mtime and hash of the document and of every
+    file its transform tried to read through a path selector or an import,
+    including the files it did not find. It is used only while all
+    of them are unchanged: a file whose size or mtime differ is hashed again
+    and the entry is dropped if the hash differs too, or if a missing file has
+    appeared. An entry that cannot be read is dropped and rebuilt.
+
+    Entries are pickles, so the cache directory must be as trusted as the
+    configuration itself.
+
+    Args:
+        cache_dir (pathlib.Path or str): The directory holding the entries; it
+            is created when the first entry is written.
+
+    Examples:
+        >>> cache = TransformCache('/var/tmp/myapp-config')
+        >>> config = cache.load('config/app.yaml')
+    """
+    # entries of another format are misses
+    FORMAT = 1
+    SUFFIX = '.pickle'
+
+    def __init__(self, cache_dir):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path, yamlator_class=YAMLator, methods=None, allow_tree_subs=True, dependency_order=False):
+        """Loads and transforms a YAML document, from the cache when possible.
+
+        Args:
+            path (pathlib.Path or str): The YAML document; its directory is the
+                root_dir of the YAMLator, as with `YAMLator.load`.
+            yamlator_class (type, optional): The YAMLator subclass to create.
+                Defaults to YAMLator.
+            methods, allow_tree_subs, dependency_order: Passed on to
+                `YAMLator.transform`; each combination of them has its own
+                entry.
+
+        Returns:
+            YAMLator: The transformed document.
+        """
+        _path = pathlib.Path(path).absolute()
+        _entry_path = self.cache_dir.joinpath(self._entry_name(
+            _path, yamlator_class, methods, allow_tree_subs, dependency_order))
+
+        _odict = self._read(_entry_path)
+        if _odict is not None:
+            self.hits += 1
+            return yamlator_class(_odict, root_dir=_path.parent)
+        self.misses += 1
+
+        _read_paths = []
+        _dependencies = [self._stamp(_path)]
+        with _path.open('r') as f:
+            _yltr = yamlator_class.load(f)
+        _yltr.transform(methods=methods, allow_tree_subs=allow_tree_subs, dependency_order=dependency_order,
+                        read_paths=_read_paths)
+
+        _seen = {_path}
+        for _read_path in _read_paths:
+            _read_path = pathlib.Path(_read_path).absolute()
+            if _read_path not in _seen:
+                _seen.add(_read_path)
+                _dependencies.append(self._stamp(_read_path))
+        self._write(_entry_path, _dependencies, _yltr.odict)
+        return _yltr
+
+    def clear(self):
+        """Removes every entry."""
+        if self.cache_dir.is_dir():
+            for _entry_path in self.cache_dir.glob('*' + self.SUFFIX):
+                _entry_path.unlink(missing_ok=True)
+
+    def _entry_name(self, path, yamlator_class, methods, allow_tree_subs, dependency_order):
+        # every argument load() passes on to transform() is part of the key
+        _key = repr((self.FORMAT, str(path), f'{yamlator_class.__module__}.{yamlator_class.__qualname__}',
+                     None if methods is None else tuple(methods), allow_tree_subs, bool(dependency_order)))
+        return hashlib.blake2b(_key.encode(), digest_size=16).hexdigest() + self.SUFFIX
+
+    @staticmethod
+    def _stamp(path):
+        # (path, size, mtime, hash) of a file, the last three None if it does not exist
+        try:
+            _stat = path.stat()
+            return str(path), _stat.st_size, _stat.st_mtime_ns, TransformCache._hash(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return str(path), None, None, None
+
+    @staticmethod
+    def _hash(path):
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _is_current(stamp):
+        _path_str, _size, _mtime, _hash = stamp
+        _path = pathlib.Path(_path_str)
+        try:
+            _stat = _path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return _size is None
+        if _size is None:
+            return False
+        if _stat.st_size == _size and _stat.st_mtime_ns == _mtime:
+            return True
+        # touched, or rewritten with a different mtime: only a new hash counts
+        return _stat.st_size == _size and TransformCache._hash(_path) == _hash
+
+    def _read(self, entry_path):
+        # the cached odict if the entry is readable and current, otherwise None
+        try:
+            with entry_path.open('rb') as f:
+                _format, _dependencies, _odict = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # truncated, garbled or of an older layout
+            if _DEBUG.TransformCache:
+                ic(e)
+            entry_path.unlink(missing_ok=True)
+            return None
+
+        if _format != self.FORMAT or not isinstance(_odict, OrderedDict):
+            entry_path.unlink(missing_ok=True)
+            return None
+        for _stamp in _dependencies:
+            if not self._is_current(_stamp):
+                if _DEBUG.TransformCache:
+                    _msg = f'{_stamp[0]} changed'
+                    ic(_msg)
+                return None
+        return _odict
+
+    def _write(self, entry_path, dependencies, odict):
+        # written to a temporary file first, so readers never see half an entry
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _fd, _tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(_fd, 'wb') as f:
+                    pickle.dump((self.FORMAT, dependencies, odict), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(_tmp_path, entry_path)
+            except BaseException:
+                pathlib.Path(_tmp_path).unlink(missing_ok=True)
+                raise
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # an entry that cannot be written only costs the next run a transform
+            if _DEBUG.TransformCache:
+                ic(e)
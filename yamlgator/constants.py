@@ -6,6 +6,7 @@ import yaml
 import astor
 import pathlib
 import typing
+import hashlib
 
 from copy import copy,deepcopy
 from collections import OrderedDict
@@ -20,6 +21,13 @@ try:
 except ImportError:  # Graceful fallback if IceCream isn't installed.
     ic = lambda *a: None if not a else (a[0] if len(a) == 1 else a)  # noqa
 
+# the pure Python emitter: str(tree) is spliced into tree substitutions, and
+# libyaml's emitter folds long double-quoted scalars differently
+DEFAULT_DUMPER = yaml.Dumper
+# libyaml's emitter and parser when PyYAML was built with it
+FAST_DUMPER = getattr(yaml, 'CDumper', yaml.Dumper)
+DEFAULT_LOADER = getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+
 KEYCHAIN_SEP = r'/'
 KEY_OR_KEYCHAIN_OP = r'))'
 KEYCHAIN_LEFT_BOUND = r'{'
@@ -2,10 +2,62 @@ from ..tree import *
 
 # this has no role yet
 class AbstractEvaluator(Tree):
+    """Walks a tree and evaluates its branches and leaves in place.
 
+    Evaluators edit the tree through `get`, `pop`, `reset` and `overlay`, which
+    keep its key index and fingerprints current. An evaluator that writes to
+    the underlying OrderedDicts directly must report each edited branch with
+    `_on_invalidate(keychain)`. While the tree indexes its keys, `evaluate()`
+    reports a branch whose keys `_pre_evaluate` or `_post_evaluate` changed
+    without telling the index itself, so relative lookups stay exact.
+    `YAMLator.transform` finds its fixed point with the fingerprints; before it
+    stops, it rehashes the whole tree and, if an unreported edit changed it,
+    drops the cached state and runs another pass.
+    """
+    # substrings without which a key or str leaf is left as it is; None if any may change
+    markers = None
 
     def evaluate(self,*args):
-        self.visit(self._pre_evaluate, self._post_evaluate, self._value_evaluate)
+        _pre_evaluate, _post_evaluate = self._pre_evaluate, self._post_evaluate
+        if self._key_index is not None:
+            if type(self)._pre_evaluate is not AbstractEvaluator._pre_evaluate:
+                _pre_evaluate = self._reporting_key_edits(_pre_evaluate)
+            if type(self)._post_evaluate is not AbstractEvaluator._post_evaluate:
+                _post_evaluate = self._reporting_key_edits(_post_evaluate)
+        self.visit(_pre_evaluate, _post_evaluate, self._value_evaluate, skip_settled=self._skip_settled())
+
+    def _reporting_key_edits(self, process):
+        # wraps a branch callback so a branch it rewrote in place without
+        # telling the key index is reported with _on_invalidate()
+        _key_index = self._key_index
+
+        def _process(node, keychain):
+            _edits = _key_index.edits
+            _items = list(node.items())
+            process(node, keychain)
+            if _key_index.edits == _edits and self._keys_edited(_items, node):
+                self._on_invalidate(keychain)
+        return _process
+
+    @staticmethod
+    def _keys_edited(items, node):
+        # did the keys of node, or the branches under them, change from items
+        if len(items) != len(node):
+            return True
+        for (_key, _value), (_new_key, _new_value) in zip(items, node.items()):
+            if _key != _new_key:
+                return True
+            if _value is not _new_value and (isinstance(_value, OrderedDict) or isinstance(_new_value, OrderedDict)):
+                return True
+        return False
+
+    def _skip_settled(self):
+        # YAMLator.transform schedules its passes on the settled nodes of the
+        # shared fingerprints; skip them if they are settled for our markers too
+        _settle_markers = self._fingerprints.settle_markers if self._fingerprints is not None else None
+        if _settle_markers is None or self.markers is None or not set(self.markers) <= set(_settle_markers):
+            return None
+        return _settle_markers
 
     def _pre_evaluate(self, node, keychain):
         pass
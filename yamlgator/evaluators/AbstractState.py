@@ -11,7 +11,7 @@ class AbstractState(Tree):
     def copy(self):
         """Copies the object.
         """
-        _as = self.__class__(self.pre_observables,self.value_observables,self.post_observables,deepcopy(self.odict))
+        _as = self.__class__(self.pre_observables,self.value_observables,self.post_observables,self._copy_odict())
         return _as
 
     def pre_update(self,node,keychain):
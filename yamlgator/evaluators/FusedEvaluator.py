@@ -0,0 +1,181 @@
+import contextlib
+
+from ..constants import *
+from ..tree import *
+from .AbstractEvaluator import *
+
+from . import DEBUG
+
+# what _leaf() returns for a keychain that does not lead to a leaf
+_NOT_A_LEAF = object()
+
+
+class FusedEvaluator(AbstractEvaluator):
+    """Runs one pass of a transform's utilities, finding their work in a single walk.
+
+    `YAMLator.transform(fused=True)` runs its passes through this evaluator
+    instead of giving each utility a full walk of its own. A pass first walks
+    the unsettled nodes once and searches each leaf, and the keys of each
+    branch, with the `probe_regex` of every utility, or with its markers if it
+    has none. A node a utility's probe does not find is one the utility leaves
+    as it is.
+
+    The utilities then run one after the other in the given order, so the tree
+    goes through the same states as in an unfused pass:
+
+    * a utility the walk found nothing for is neither created nor run;
+    * a utility with `local_edits`, which writes only the leaf it evaluates,
+      evaluates the leaves found for it and nothing else, in document order;
+      those leaves are probed again for the utilities after it;
+    * any other utility runs its own `evaluate()`, and the tree is probed again
+      if it edited anything.
+
+    A leaf that is not a str or a list of single-line strs is found for every
+    utility that evaluates leaves, since evaluating rewrites it. A utility
+    whose class is not known, that declares no markers or that overrides
+    `evaluate` runs every pass.
+
+    Args:
+        odict_or_tree (Tree | OrderedDict): The tree the utilities transform.
+        utilities (list[tuple[str, type, typing.Callable]]): The name, class and
+            factory of each utility, in the order they run; the factory is
+            called when the utility runs, and the class may be None.
+        profile (TransformProfile, optional): Records what each utility that
+            runs did. Defaults to None.
+    """
+    def __init__(self, odict_or_tree, utilities, profile=None):
+        super().__init__(odict_or_tree)
+        self.utilities = utilities
+        self.profile = profile
+        self._probes = [self._probe_for(_class) for _name, _class, _factory in utilities]
+        # (index, search) of the utilities that evaluate keys, and of those that evaluate leaves
+        self._key_searches = [(_index, _probe[0]) for _index, _probe in enumerate(self._probes)
+                              if _probe is not None and _probe[1]]
+        self._leaf_searches = [(_index, _probe[0]) for _index, _probe in enumerate(self._probes)
+                               if _probe is not None and _probe[2]]
+        # [keychain, indexes of the utilities that may change the node] in document order
+        self.candidates = []
+
+    @staticmethod
+    def _probe_for(utility_class):
+        # (search, evaluates keys, evaluates leaves, local edits), None if the utility always runs
+        if utility_class is None or getattr(utility_class, 'markers', None) is None \
+                or utility_class.evaluate is not AbstractEvaluator.evaluate \
+                or utility_class._post_evaluate is not AbstractEvaluator._post_evaluate:
+            return None
+        _probe_regex = getattr(utility_class, 'probe_regex', None)
+        if _probe_regex is None:
+            _probe_regex = '|'.join(map(re.escape, utility_class.markers))
+        _keys = utility_class._pre_evaluate is not AbstractEvaluator._pre_evaluate
+        _leaves = utility_class._value_evaluate is not AbstractEvaluator._value_evaluate
+        _local_edits = _leaves and not _keys and getattr(utility_class, 'local_edits', False)
+        return re.compile(_probe_regex).search, _keys, _leaves, _local_edits
+
+    def evaluate(self, iteration=0):
+        """Runs one pass of the utilities.
+
+        Args:
+            iteration (int, optional): The pass, for the profile. Defaults to 0.
+        """
+        self._probe()
+        for _index, (_name, _class, _factory) in enumerate(self.utilities):
+            _probe = self._probes[_index]
+            if _probe is not None:
+                _candidates = [_candidate for _candidate in self.candidates if _index in _candidate[1]]
+                if not _candidates:
+                    if DEBUG.FusedEvaluator:
+                        _msg = f'nothing for {_name}'
+                        ic(_msg)
+                    continue
+
+            _utility = _factory()
+            if _probe is not None and _probe[3]:
+                self._evaluate_leaves(_utility, _name, iteration, _candidates)
+                continue
+
+            _edits = self._fingerprints.edits if self._fingerprints is not None else None
+            if self.profile is None:
+                _utility.evaluate()
+            else:
+                self.profile.evaluate(_utility, _name, iteration)
+            if _edits is None or self._fingerprints.edits != _edits:
+                self._probe()
+
+    def _evaluate_leaves(self, utility, name, iteration, candidates):
+        if DEBUG.FusedEvaluator:
+            _msg = f'{name} evaluates {len(candidates)} leaves'
+            ic(_msg)
+        _instrument = self.profile.instrument(utility, name, iteration) \
+            if self.profile is not None else contextlib.nullcontext()
+        with _instrument:
+            _value_evaluate = utility._value_evaluate
+            for _keychain, _ in candidates:
+                _value = self._leaf(_keychain)
+                if _value is not _NOT_A_LEAF:
+                    _value_evaluate(_value, list(_keychain))
+
+        # only the evaluated leaves can have changed
+        _evaluated = set(map(id, candidates))
+        _candidates = []
+        for _candidate in self.candidates:
+            if id(_candidate) in _evaluated:
+                self._probe_node(_candidate[0], _candidates)
+            else:
+                _candidates.append(_candidate)
+        self.candidates = _candidates
+
+    def _leaf(self, keychain):
+        _node = self.odict
+        for _key in keychain:
+            if not isinstance(_node, self._branch_type) or _key not in _node:
+                return _NOT_A_LEAF
+            _node = _node[_key]
+        return _node if not isinstance(_node, self._branch_type) else _NOT_A_LEAF
+
+    def _probe(self):
+        self.candidates = _candidates = []
+        _settle_markers = self._fingerprints.settle_markers if self._fingerprints is not None else None
+        self.visit(
+            lambda _node, _keychain: self._probe_branch(_node, tuple(_keychain), _candidates),
+            lambda _node, _keychain: None,
+            lambda _value, _keychain: self._probe_leaf(_value, tuple(_keychain), _candidates),
+            skip_settled=_settle_markers)
+
+    def _probe_node(self, keychain, candidates):
+        # probes the node now at keychain and, if it is a branch, everything under it
+        _node = self.odict
+        for _key in keychain:
+            if not isinstance(_node, self._branch_type) or _key not in _node:
+                return
+            _node = _node[_key]
+        # the leaves a walk would skip as settled
+        _settle_markers = self._fingerprints.settle_markers if self._fingerprints is not None else None
+        if not isinstance(_node, self._branch_type):
+            if _settle_markers is None or not TreeFingerprints.settled_leaf(_node, _settle_markers):
+                self._probe_leaf(_node, keychain, candidates)
+            return
+        self._probe_branch(_node, keychain, candidates)
+        for _child_keychain, _value, _is_branch in Tree(_node)._iter_nodes(relative=True):
+            if _is_branch:
+                self._probe_branch(_value, keychain + tuple(_child_keychain), candidates)
+            elif _settle_markers is None or not TreeFingerprints.settled_leaf(_value, _settle_markers):
+                self._probe_leaf(_value, keychain + tuple(_child_keychain), candidates)
+
+    def _probe_branch(self, node, keychain, candidates):
+        if not self._key_searches:
+            return
+        _keys = [str(_key) for _key in node]
+        _found = [_index for _index, _search in self._key_searches if any(map(_search, _keys))]
+        if _found:
+            candidates.append([keychain, _found])
+
+    def _probe_leaf(self, value, keychain, candidates):
+        if type(value) is str:
+            _found = [_index for _index, _search in self._leaf_searches if _search(value)]
+        elif TreeFingerprints.settled_leaf(value, ()):
+            _found = [_index for _index, _search in self._leaf_searches if any(map(_search, value))]
+        else:
+            # evaluating a leaf that is not a str or single-line strs rewrites it
+            _found = [_index for _index, _search in self._leaf_searches]
+        if _found:
+            candidates.append([keychain, _found])
@@ -1,5 +1,6 @@
 class DEBUG:
     StateEvaluator = False
+    FusedEvaluator = False
     TreeState = False
     AggregateState = False
     DAggregateState = False
@@ -0,0 +1,133 @@
+import os
+import contextlib
+import threading
+
+from .constants import *
+from .tree import *
+
+
+class _DEBUG:
+    ParsedFileCache = False
+
+# the cache each thread activated, if any
+_ACTIVE = threading.local()
+
+
+class ParsedFileCache:
+    """The parsed contents of the files path selectors and imports read.
+
+    `YAMLTransformer` and `PlainTextTransformer`, and with them
+    `YAMLator.merge` and the import transformer, read their files through the
+    cache they were made with, if any. A file selected from many places is
+    then parsed once, and each selection gets its own copy of the parsed tree.
+
+    Entries are keyed by the file's device and inode, so every path to a
+    file shares one, and are used only while the file's size, mtime and ctime
+    are unchanged. The least recently used entries are dropped beyond
+    `max_entries`.
+
+    `YAMLator.transform` and `YAMLator.merge` pass the cache active in their
+    thread to the transformers they make; without one, a transform makes a
+    new cache for its own duration, so it parses each file once however many
+    passes it runs. Activate one yourself to share it between the transforms
+    and merges of a thread. A cache is not locked: threads that share one
+    must not transform at the same time.
+
+    Args:
+        max_entries (int, optional): The most files kept. Defaults to 256.
+
+    Examples:
+        >>> file_cache = ParsedFileCache()
+        >>> with file_cache.active():
+        ...     for yltr in configs:
+        ...         yltr.transform()
+        >>> file_cache.hits, file_cache.misses
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.contextmanager
+    def active(self):
+        """Reads the files of this thread's transforms and merges through this cache inside the with block."""
+        _previous = getattr(_ACTIVE, 'cache', None)
+        _ACTIVE.cache = self
+        try:
+            yield self
+        finally:
+            _ACTIVE.cache = _previous
+
+    @staticmethod
+    def current():
+        """The cache active in this thread, or None."""
+        return getattr(_ACTIVE, 'cache', None)
+
+    def load_yaml(self, stream):
+        """Parses an open YAML file like `Tree._load`, or copies its last parse.
+
+        Returns:
+            typing.Any: The parsed document, which the caller may modify.
+        """
+        _document, _settled = self._get('yaml', stream, self._parse_yaml)
+        if type(_document) is OrderedDict:
+            return Tree(_document)._copy_odict()
+        return deepcopy(_document)
+
+    def load_settled_yaml(self, stream, markers):
+        """Returns the last parse of an open YAML file itself, if it is settled.
+
+        Args:
+            stream (typing.IO): The open file.
+            markers (tuple[str]): The substrings no key or value may hold.
+
+        Returns:
+            OrderedDict | None: The shared parsed mapping, which the caller
+            must not modify, or None if the file is not a mapping or holds
+            one of markers.
+        """
+        _document, _settled = self._get('yaml', stream, self._parse_yaml)
+        if type(_document) is not OrderedDict:
+            return None
+        markers = tuple(markers)
+        if markers not in _settled:
+            _settled[markers] = all(
+                not any(_marker in str(_keychain[-1]) for _marker in markers)
+                and (_is_branch or TreeFingerprints.settled_leaf(_value, markers))
+                for _keychain, _value, _is_branch in Tree(_document)._iter_nodes())
+        return _document if _settled[markers] else None
+
+    def read_text(self, stream):
+        """Reads an open text file, or returns its last read."""
+        return self._get('text', stream, lambda _stream: _stream.read())
+
+    def clear(self):
+        """Drops every entry; the counters are kept."""
+        self.entries.clear()
+
+    @staticmethod
+    def _parse_yaml(stream):
+        # the document, and whether it is settled by markers
+        return Tree._load(stream), {}
+
+    def _get(self, kind, stream, parse):
+        _stat = os.fstat(stream.fileno())
+        _key = (kind, _stat.st_dev, _stat.st_ino)
+        _signature = (_stat.st_size, _stat.st_mtime_ns, _stat.st_ctime_ns)
+        _entry = self.entries.get(_key)
+        if _entry is not None and _entry[0] == _signature:
+            self.hits += 1
+            self.entries.move_to_end(_key)
+            return _entry[1]
+
+        self.misses += 1
+        if _DEBUG.ParsedFileCache:
+            _msg = f'parsing {stream.name}'
+            ic(_msg)
+        _value = parse(stream)
+        self.entries[_key] = (_signature, _value)
+        self.entries.move_to_end(_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return _value
@@ -14,6 +14,25 @@ class ObjectFunctor:
         return self._function(*_args, **_kargs)
 
 
+class SharedObjectFunctor:
+    """an ObjectFunctor registered on a class, shared by all its instances
+
+    with bind=True the instance it is read from becomes the first argument;
+    that functor is made on first access and kept on the instance
+    """
+    def __init__(self, name, function, *args, bind=False, **kargs):
+        self._name = name
+        self._bind = bind
+        self._functor = ObjectFunctor(function, *args, **kargs)
+
+    def __get__(self, instance, owner=None):
+        if instance is None or not self._bind:
+            return self._functor
+        _functor = ObjectFunctor(self._functor._function, instance, *self._functor._args, **self._functor._kargs)
+        instance.__dict__[self._name] = _functor
+        return _functor
+
+
 class ObjectDB:
     def _register(self, name, constructor, *args, **kargs):
         """register a constructor"""
@@ -21,3 +40,8 @@ class ObjectDB:
         _args.extend(args)
         setattr(self, name, ObjectFunctor(*_args, **kargs))
 
+    @classmethod
+    def _register_shared(cls, name, constructor, *args, bind=False, **kargs):
+        """register a constructor for every instance; an instance _register() overrides it"""
+        setattr(cls, name, SharedObjectFunctor(name, constructor, *args, bind=bind, **kargs))
+
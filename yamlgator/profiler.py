@@ -0,0 +1,163 @@
+import json
+import time
+import contextlib
+import collections
+import dataclasses
+
+from .constants import *
+from .tree import *
+
+
+class _DEBUG:
+    TransformProfile = False
+
+
+@dataclass
+class UtilityProfile:
+    """What one utility did in one pass of a YAMLator.transform() call."""
+    utility: str
+    # the pass, counted from 1; 0 is the dependency-ordered substitution before the loop
+    iteration: int
+    seconds: float = 0.0
+    # branches and leaves the utility's walk evaluated
+    nodes_visited: int = 0
+    # tokens the utility's extract regex matched, cached or not
+    tokens_matched: int = 0
+    # matched tokens the utility produced a value for, kept or not
+    substitutions: int = 0
+    # files path selectors and imports tried to read
+    files_read: int = 0
+    # nodes the walk skipped because they were settled
+    cache_hits: int = 0
+
+
+class TransformProfile:
+    """Per-utility, per-pass timings and counters of a YAMLator.transform() call.
+
+    Pass `profile=True` to `transform` to get one in `TransformReport.profile`.
+    Each utility run gets a `UtilityProfile` in `records`. The time spent
+    evaluating each keychain is summed in `keychain_seconds` across all
+    passes and utilities.
+
+    The counters come from wrapping the utility's evaluate callbacks and its
+    `_extract_tokens` and `_transform` methods on the instance. A transform that is
+    not profiled runs the unwrapped utilities.
+
+    Examples:
+        >>> report = yltr.transform(profile=True)
+        >>> report.profile.hottest_keychains(5)
+        >>> pathlib.Path('transform-profile.json').write_text(report.profile.to_json())
+    """
+    def __init__(self):
+        self.records = []
+        self.keychain_seconds = collections.Counter()
+
+    def evaluate(self, utility, name, iteration):
+        """Runs `utility.evaluate()` and records what it did."""
+        with self.instrument(utility, name, iteration):
+            utility.evaluate()
+
+    @contextlib.contextmanager
+    def instrument(self, utility, name, iteration):
+        """Records what a utility does inside the with block.
+
+        Args:
+            utility (AbstractEvaluator): The utility instance; its methods are
+                wrapped for the duration of the block.
+            name (str): The name of the utility, i.e. its YAMLator method.
+            iteration (int): The pass of the transform.
+
+        Yields:
+            UtilityProfile: The record, already appended to `records`.
+        """
+        _record = UtilityProfile(name, iteration)
+        self.records.append(_record)
+        _keychain_seconds = self.keychain_seconds
+        _perf_counter = time.perf_counter
+
+        # every node but the ones the walk skips gets a callback
+        _nodes = 1 + sum(1 for _ in Tree(utility.odict)._iter_nodes())
+
+        def _timed(evaluate):
+            def _timed_evaluate(node, keychain):
+                _start = _perf_counter()
+                try:
+                    return evaluate(node, keychain)
+                finally:
+                    _keychain_seconds[tuple(keychain)] += _perf_counter() - _start
+                    _record.nodes_visited += 1
+            return _timed_evaluate
+
+        def _counted_extract_tokens(expression, _extract_tokens=utility._extract_tokens):
+            _tokens = _extract_tokens(expression)
+            _record.tokens_matched += sum(1 for _token, _groups in _tokens if _groups is not None)
+            return _tokens
+
+        def _counted_transform(parameters, keychain, _transform=utility._transform):
+            _value = _transform(parameters, keychain)
+            if _value is not None:
+                _record.substitutions += 1
+            return _value
+
+        utility._pre_evaluate = _timed(utility._pre_evaluate)
+        utility._value_evaluate = _timed(utility._value_evaluate)
+        utility._extract_tokens = _counted_extract_tokens
+        utility._transform = _counted_transform
+
+        # reads are counted through the read_paths list transform() gives the utilities that read files
+        _read_paths = getattr(utility, 'read_paths', None)
+        _reads = len(_read_paths) if _read_paths is not None else 0
+
+        _start = _perf_counter()
+        try:
+            yield _record
+        finally:
+            _record.seconds = _perf_counter() - _start
+            _record.files_read = len(_read_paths) - _reads if _read_paths is not None else 0
+            _record.cache_hits = max(0, _nodes - _record.nodes_visited)
+            for _method in ('_pre_evaluate', '_value_evaluate', '_extract_tokens', '_transform'):
+                vars(utility).pop(_method, None)
+            if _DEBUG.TransformProfile:
+                ic(_record)
+
+    def totals(self):
+        """Sums the records of each utility over all passes.
+
+        Returns:
+            dict[str, UtilityProfile]: The totals by utility, in the order the
+            utilities first ran; their `iteration` is the number of passes.
+        """
+        _totals = {}
+        for _record in self.records:
+            _total = _totals.get(_record.utility)
+            if _total is None:
+                _total = _totals[_record.utility] = UtilityProfile(_record.utility, 0)
+            _total.iteration += 1
+            for _field in ('seconds', 'nodes_visited', 'tokens_matched', 'substitutions', 'files_read', 'cache_hits'):
+                setattr(_total, _field, getattr(_total, _field) + getattr(_record, _field))
+        return _totals
+
+    def hottest_keychains(self, count=10):
+        """The keychains evaluation spent the most time on.
+
+        Args:
+            count (int, optional): How many to return. Defaults to 10.
+
+        Returns:
+            list[tuple[str, float]]: Keychain strings and seconds, slowest first.
+        """
+        return [('/' + '/'.join(map(str, _keychain)), _seconds)
+                for _keychain, _seconds in self.keychain_seconds.most_common(count)]
+
+    def as_dict(self, count=10):
+        """The profile as plain data, with the `count` hottest keychains."""
+        return {
+            'records': [dataclasses.asdict(_record) for _record in self.records],
+            'totals': [dataclasses.asdict(_total) for _total in self.totals().values()],
+            'hottest_keychains': [{'keychain': _keychain, 'seconds': _seconds}
+                                  for _keychain, _seconds in self.hottest_keychains(count)],
+        }
+
+    def to_json(self, count=10, **kwargs):
+        """The profile as a JSON document; kwargs go to `json.dumps`."""
+        return json.dumps(self.as_dict(count), **kwargs)
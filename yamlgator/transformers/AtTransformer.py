@@ -9,12 +9,14 @@ class AtTransformerException(Exception):
 
 class AtTransformer(ValueTransformer):
     name = 'transform_ats'
+    match_front = r'.*?'
     match_regex = \
         f"{re.escape(KEY_OR_KEYCHAIN_OP)}{re.escape(KEYCHAIN_LEFT_BOUND)}?" + \
         f"{REGEXES.AT}{re.escape(KEYCHAIN_RIGHT_BOUND)}?"
     extract_regex = \
         f"{re.escape(KEY_OR_KEYCHAIN_OP)}({re.escape(KEYCHAIN_LEFT_BOUND)}?)" + \
         f"({REGEXES.AT_EXP})({re.escape(KEYCHAIN_RIGHT_BOUND)}?)"
+    probe_regex = f"{re.escape(KEY_OR_KEYCHAIN_OP)}{re.escape(KEYCHAIN_LEFT_BOUND)}?@"
 
     def __init__(self, odict_or_tree=None, **kwargs):
         odict_or_tree = OrderedDict() if odict_or_tree is None else odict_or_tree
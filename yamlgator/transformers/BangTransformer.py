@@ -11,6 +11,9 @@ class BangTransformerException(Exception):
 class BangTransformer(ValueTransformer):
     match_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.BANG}"
     extract_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.BANG_EXP}"
+    probe_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}\!"
+    # a driver may edit any node
+    local_edits = False
 
     name = 'transform_bangs'
     def __init__(self, odict_or_tree=None, **kwargs):
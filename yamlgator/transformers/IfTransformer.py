@@ -13,6 +13,7 @@ class IfTransformer(ValueTransformer):
     name = 'transform_ifs'
     match_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.IF}"
     extract_regex = rf'{re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.IF_EXP}'
+    probe_regex = rf'{re.escape(KEY_OR_KEYCHAIN_OP)}\?'
 
     def __init__(self, odict_or_tree=None, context_tree=None, **kwargs):
         odict_or_tree = OrderedDict() if odict_or_tree is None else odict_or_tree
@@ -256,10 +257,10 @@ class IfKeyTransformer(IfTransformer):
         #     node[node_key] = new_key_value
         #     return new_key_value
 
-        _node_copy = deepcopy(node)
-        _key_index = list(_node_copy.keys()).index(node_key)
+        _node_keys = list(node.keys())
+        _key_index = _node_keys.index(node_key)
 
-        for _key in list(_node_copy.keys())[:_key_index]:
+        for _key in _node_keys[:_key_index]:
             if DEBUG.IfKeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -277,7 +278,7 @@ class IfKeyTransformer(IfTransformer):
             for _key in new_key_value.keys():
                 node[_key] = new_key_value.get(_key)
 
-        for _key in list(_node_copy.keys())[_key_index + 1:]:
+        for _key in _node_keys[_key_index + 1:]:
             if DEBUG.IfKeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -318,8 +319,8 @@ class IfKeyTransformer(IfTransformer):
             _logical_exp,_forward_slash = _parameters.groups()
             _logical_sub_exps = re.findall(REGEXES.LOGICAL_KEY_EXP, _logical_exp)
 
-            _node_copy = deepcopy(node)
-            _key_index = list(_node_copy.keys()).index(_node_key)
+            _node_keys = list(node.keys())
+            _key_index = _node_keys.index(_node_key)
             _branches = node.get(_node_key)
             if isinstance(_branches,OrderedDict):
                 assert len(list(_branches.keys())) < 3
@@ -410,6 +411,8 @@ class IfKeyTransformer(IfTransformer):
                     else:
                         _ = node.pop(_node_key)
 
+            self._on_invalidate(keychain)
+
 
 class IfKeyTransformerUtility(IfKeyTransformer):
     def __init__(self, *args, **kwargs):
@@ -10,8 +10,10 @@ class ImportTransformer(KeyTransformer):
     name = 'transform_imports'
     match_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.IMPORT}"
     extract_regex = rf"({re.escape(KEY_OR_KEYCHAIN_OP)}{REGEXES.IMPORT_EXP})"
+    probe_regex = rf"{re.escape(KEY_OR_KEYCHAIN_OP)}\+"
 
-    def __init__(self, odict_or_yamlator_or_tree=None, context_tree=None, allow_tree_subs=False, root_dir=None):
+    def __init__(self, odict_or_yamlator_or_tree=None, context_tree=None, allow_tree_subs=False, root_dir=None,
+                 file_cache=None, read_paths=None):
         if hasattr(odict_or_yamlator_or_tree, 'root_dir') and root_dir is None:
             self.root_dir = odict_or_yamlator_or_tree.root_dir
         else:
@@ -19,16 +21,19 @@ class ImportTransformer(KeyTransformer):
             self.root_dir = pathlib.Path(root_dir).absolute()
 
         super(ImportTransformer,self).__init__(odict_or_yamlator_or_tree, context_tree)
+        # passed on to the transformers that read the imported files
+        self.file_cache = file_cache
+        self.read_paths = read_paths
 
     def _replace_node_key(self, node, node_key, _transformed_key):
 
         if DEBUG.KeyTransformer:
             ic(node_key)
             ic(_transformed_key)
-        _node_copy = deepcopy(node)
-        _key_index = list(_node_copy.keys()).index(node_key)
+        _node_keys = list(node.keys())
+        _key_index = _node_keys.index(node_key)
 
-        for _key in list(_node_copy.keys())[:_key_index]:
+        for _key in _node_keys[:_key_index]:
             if DEBUG.KeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -47,7 +52,7 @@ class ImportTransformer(KeyTransformer):
             node[_k] = _v
         # node[_transformed_key] = _value
 
-        for _key in list(_node_copy.keys())[_key_index + 1:]:
+        for _key in _node_keys[_key_index + 1:]:
             if DEBUG.KeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -69,17 +74,20 @@ class ImportTransformer(KeyTransformer):
             _input_tree = Tree(OrderedDict({_node_key:_selector_value}))
             ValueTransformer(_input_tree,context_tree=self,allow_tree_subs=False).evaluate()
 
-            YAMLTransformer(_input_tree,root_dir=self.root_dir).evaluate()
+            YAMLTransformer(_input_tree,root_dir=self.root_dir,
+                            file_cache=self.file_cache,read_paths=self.read_paths).evaluate()
 
             _transformed_value = _input_tree.get(_node_key + '/')
             # TODO: this is broken; why cannot we pass a keychain string??
             # _transformed_value = _input_tree.get([_node_key,''])
             _path,_selector = _selector_value.split('#')
             _new_root_dir = self.root_dir.joinpath(pathlib.Path(_path).parent)
-            ImportTransformer(_transformed_value,root_dir=_new_root_dir).evaluate()
+            ImportTransformer(_transformed_value,root_dir=_new_root_dir,
+                              file_cache=self.file_cache,read_paths=self.read_paths).evaluate()
         else:
             _transformed_value = _selector_value
-            ImportTransformer(_transformed_value,root_dir=self.root_dir).evaluate()
+            ImportTransformer(_transformed_value,root_dir=self.root_dir,
+                              file_cache=self.file_cache,read_paths=self.read_paths).evaluate()
 
         if isinstance(_transformed_value,Tree):
             if DEBUG.ImportTransformer:
@@ -96,18 +104,19 @@ class ImportTransformer(KeyTransformer):
             ic(node.keys())
 
         for _node_key in copy(list(node.keys())):
+            if self._is_literal(_node_key):
+                continue
             _tmp_key = _node_key
 
-            _tokenized_key = self._tokenize(_tmp_key)
+            _tokenized_key = self._extract_tokens(_tmp_key)
             if DEBUG.KeyTransformer:
                 ic(_tokenized_key)
 
             _transformed_token = None
-            for _token in _tokenized_key:
+            for _token, _groups in _tokenized_key:
                 _transformed_token = _token
-                _match = self._extract(_token)
-                if _match is not None:
-                    _transformed_token = self._transform(_match.groups(), keychain)
+                if _groups is not None:
+                    _transformed_token = self._transform(_groups, keychain)
 
                 if _transformed_token is None:
                     _transformed_token = _token
@@ -119,6 +128,7 @@ class ImportTransformer(KeyTransformer):
 
             if isinstance(_transformed_token,OrderedDict):
                 self._replace_node_key(node,_node_key,_transformed_token)
+                self._on_invalidate(keychain)
 
 
 class ImportTransformerUtility(ImportTransformer):
@@ -5,6 +5,8 @@ from .Transformer import *
 from . import DEBUG
 
 class KeyChainTransformer(Transformer):
+    markers = (KEY_OR_KEYCHAIN_OP,)
+    match_front = r'.*?'
     match_regex = \
         f"{re.escape(KEY_OR_KEYCHAIN_OP)}{re.escape(KEYCHAIN_LEFT_BOUND)}?" + \
         f"{REGEXES.KEYCHAIN}{REGEXES.KEY}/?{re.escape(KEYCHAIN_RIGHT_BOUND)}?" + \
@@ -14,6 +16,7 @@ class KeyChainTransformer(Transformer):
         f"{re.escape(KEY_OR_KEYCHAIN_OP)}{re.escape(KEYCHAIN_LEFT_BOUND)}?" + \
         f"({REGEXES.KEYCHAIN}{REGEXES.KEY}/?){re.escape(KEYCHAIN_RIGHT_BOUND)}?" + \
         f"(?:{re.escape('[')}({REGEXES.DATA_INDEX}){re.escape(']')})?"
+    probe_regex = f"{re.escape(KEY_OR_KEYCHAIN_OP)}{re.escape(KEYCHAIN_LEFT_BOUND)}?[/a-zA-Z0-9_]"
 
     def __init__(self, odict_or_tree=None, context_tree=None, allow_tree_subs=True):
         # super(KeyChainTransformer,self).__init__(odict_or_tree)
@@ -18,10 +18,10 @@ class KeyTransformer(KeyChainTransformer):
         if DEBUG.KeyTransformer:
             ic(node_key)
             ic(_transformed_key)
-        _node_copy = deepcopy(node)
-        _key_index = list(_node_copy.keys()).index(node_key)
+        _node_keys = list(node.keys())
+        _key_index = _node_keys.index(node_key)
 
-        for _key in list(_node_copy.keys())[:_key_index]:
+        for _key in _node_keys[:_key_index]:
             if DEBUG.KeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -38,7 +38,7 @@ class KeyTransformer(KeyChainTransformer):
 
         node[_transformed_key] = _value
 
-        for _key in list(_node_copy.keys())[_key_index + 1:]:
+        for _key in _node_keys[_key_index + 1:]:
             if DEBUG.KeyTransformer:
                 _msg = f'moving {_key}'
                 ic(_msg)
@@ -52,20 +52,21 @@ class KeyTransformer(KeyChainTransformer):
             ic(node.keys())
 
         for _node_key in copy(list(node.keys())):
+            if self._is_literal(_node_key):
+                continue
             _tmp_key = _node_key
 
-            _tokenized_key = self._tokenize(_tmp_key)
+            _tokenized_key = self._extract_tokens(_tmp_key)
             if DEBUG.KeyTransformer:
                 ic(_tokenized_key)
 
             _transformed_lines = []
             _transformed_key = []
 
-            for _token in _tokenized_key:
+            for _token, _groups in _tokenized_key:
                 _transformed_token = _token
-                _match = self._extract(_token)
-                if _match is not None:
-                    _transformed_token = self._transform(_match.groups(), keychain)
+                if _groups is not None:
+                    _transformed_token = self._transform(_groups, keychain)
 
                 if _transformed_token is None:
                     _transformed_token = _token
@@ -82,6 +83,7 @@ class KeyTransformer(KeyChainTransformer):
 
             if _transformed_key != _node_key:
                 self._replace_node_key(node,_node_key,_transformed_key)
+                self._on_invalidate(keychain)
 
 
 class KeyTransformerUtility(KeyTransformer):
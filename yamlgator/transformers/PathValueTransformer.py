@@ -10,21 +10,42 @@ class PathValueTransformerException(Exception):
 class PathValueTransformer(ValueTransformer):
     root_dir = None
     ext = None
+    # only selectors with a # are transformed
+    markers = ('#',)
+    match_front = r'[^:]*?'
     # the ? after # is critical. But why?
     match_regex = rf'(?:{REGEXES.POSIX_RELATIVE}|{REGEXES.POSIX_ABSOLUTE})#?{REGEXES.KEYCHAIN}?(?:{REGEXES.KEY})?/?'
     extract_regex = r'^([^#]*?)#(.*)$'
+    # any line with a # may be a selector
+    probe_regex = None
 
-    def __init__(self, odict_or_tree):
+    def __init__(self, odict_or_tree, file_cache=None, read_paths=None):
         # if not hasattr(odict_or_tree, 'root_dir'):
         #     raise PathValueTransformerException
         # self.root_dir = odict_or_tree.root_dir
         super(PathValueTransformer,self).__init__(odict_or_tree)
+        # the ParsedFileCache select() reads files through, if any
+        self.file_cache = file_cache
+        # if a list, every path _transform() tries to read is appended to it;
+        # TransformCache uses this to find the files a transformed tree depends on
+        self.read_paths = read_paths
 
 
     def select(self, stream, selector):
         '''intpret a selctor string to select bytes from stream'''
         raise NotImplemented
 
+    def _load_tree(self, stream):
+        # Tree.load(stream), through the file cache
+        if self.file_cache is None:
+            return Tree.load(stream)
+        return Tree(self.file_cache.load_yaml(stream))
+
+    def _read_text(self, stream):
+        if self.file_cache is None:
+            return stream.read()
+        return self.file_cache.read_text(stream)
+
     def _do_not_evaluate(self,value,keychain):
         # don't try to pathtransform on multi=line strings
         if isinstance(value,str) and len(value.split('\n')) > 1:
@@ -94,6 +115,9 @@ class PathValueTransformer(ValueTransformer):
             # there's always a root_dir set in the superclass
             _value_path = self.root_dir.joinpath(_path)
 
+        if self.read_paths is not None:
+            self.read_paths.append(_value_path)
+
         try:
             with _value_path.open('r') as f:
                 _new_value = self.select(f, _selector)
@@ -11,7 +11,8 @@ class PlainTextTransformer(PathValueTransformer):
     name = 'transform_plaintext'
     ext = None
 
-    def __init__(self, odict_or_yamlator_or_tree, context_tree=None, allow_tree_subs=False,root_dir=None):
+    def __init__(self, odict_or_yamlator_or_tree, context_tree=None, allow_tree_subs=False,root_dir=None,
+                 file_cache=None, read_paths=None):
 
         if hasattr(odict_or_yamlator_or_tree, 'root_dir') and root_dir is None:
             self.root_dir = odict_or_yamlator_or_tree.root_dir
@@ -19,7 +20,7 @@ class PlainTextTransformer(PathValueTransformer):
             root_dir = pathlib.Path('.') if root_dir is None else root_dir
             self.root_dir = pathlib.Path(root_dir).absolute()
 
-        super(PlainTextTransformer,self).__init__(odict_or_yamlator_or_tree)
+        super(PlainTextTransformer,self).__init__(odict_or_yamlator_or_tree, file_cache=file_cache, read_paths=read_paths)
 
         if DEBUG.PlainTextTransformer:
             ic(self.__class__)
@@ -43,7 +44,7 @@ class PlainTextTransformer(PathValueTransformer):
 
         _stream_path = pathlib.Path(stream.name)
 
-        _plain_text = stream.read()
+        _plain_text = self._read_text(stream)
 
         if DEBUG.PlainTextTransformer:
             ic(_stream_path)
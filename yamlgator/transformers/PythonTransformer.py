@@ -10,9 +10,9 @@ class PythonTransformerException(Exception):
 class PythonTransformer(PathValueTransformer):
     ext = 'py'
 
-    def __init__(self, odict_or_tree):
+    def __init__(self, odict_or_tree, **kwargs):
         if DEBUG.PythonTransformer: ic()
-        super(PythonTransformer,self).__init__(odict_or_tree)
+        super(PythonTransformer,self).__init__(odict_or_tree, **kwargs)
 
     def _loader(self,stream):
         # see https://github.com/berkerpeksag/astor/blob/master/astor/file_util.py
@@ -0,0 +1,93 @@
+from ..constants import *
+
+from . import DEBUG
+
+
+class TokenCache:
+    """A bounded LRU cache of the tokens of strings, with what `_extract()` matched in each.
+
+    `Transformer._extract_tokens()` tokenizes a line, and extracts the groups
+    of its tokens, through the cache of the transformer's class. A string that
+    appears many times in a tree, or in every pass of a transform, is then
+    tokenized once. Transformer classes that tokenize alike, like a
+    transformer and its utility, share a cache; `caches` holds them by the
+    methods and regexes that tokenize.
+
+    The least recently used strings are dropped beyond `max_entries`; a
+    cache with `max_entries` 0 is disabled. Caches are made with
+    `default_max_entries`.
+
+    Args:
+        max_entries (int, optional): The most strings kept. Defaults to
+            `default_max_entries`.
+
+    Examples:
+        >>> yltr.transform()
+        >>> cache = ValueTransformer.token_cache()
+        >>> cache.hits, cache.misses, cache.hit_rate
+        >>> TokenCache.resize_all(0)  # tokenize every time
+    """
+    default_max_entries = 4096
+    # the cache of each tokenizer
+    caches = {}
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else self.default_max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def of(cls, transformer_class):
+        """The cache of a transformer class, made on first use."""
+        _key = tuple(getattr(transformer_class, _name, None) for _name in
+                     ('_tokenize', '_match', '_extract', 'match_front', 'match_regex', 'extract_regex'))
+        _cache = cls.caches.get(_key)
+        if _cache is None:
+            _cache = cls.caches[_key] = cls()
+            if DEBUG.Transformer:
+                _msg = f'token cache for {transformer_class.__name__}'
+                ic(_msg)
+        return _cache
+
+    @classmethod
+    def resize_all(cls, max_entries):
+        """Sets the size of every cache, and of those made from now on; 0 disables them."""
+        cls.default_max_entries = max_entries
+        for _cache in cls.caches.values():
+            _cache.resize(max_entries)
+
+    @property
+    def hit_rate(self):
+        """The share of lookups that were hits, 0.0 before the first one."""
+        _lookups = self.hits + self.misses
+        return self.hits / _lookups if _lookups else 0.0
+
+    def get(self, expression):
+        """The cached tokens of expression, or None."""
+        _entry = self.entries.get(expression)
+        if _entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(expression)
+        return _entry
+
+    def put(self, expression, tokens):
+        """Keeps the tokens of expression, unless the cache is disabled."""
+        if self.max_entries <= 0:
+            return
+        self.entries[expression] = tokens
+        self.entries.move_to_end(expression)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def resize(self, max_entries):
+        """Sets max_entries, dropping the least recently used strings beyond it."""
+        self.max_entries = max_entries
+        while len(self.entries) > max(max_entries, 0):
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Drops every entry; the counters are kept."""
+        self.entries.clear()
@@ -1,12 +1,34 @@
 from ..constants import *
 from ..evaluators.AbstractEvaluator import *
+from .TokenCache import TokenCache
 
 from . import DEBUG
 
 class TransformerException(Exception):
     pass
 
+# compiled (match_front)(match_regex) patterns by those two regexes
+_TOKEN_PATTERNS = {}
+# compiled probe_regex patterns, or those of the markers, by that regex
+_PROBE_PATTERNS = {}
+
+
 class Transformer(AbstractEvaluator):
+    # the regex of the text _match() lets precede a token; it lets _tokenize()
+    # find the tokens of a line with one compiled pattern instead of _match().
+    # A subclass whose _match() is not `(match_front)(match_regex)(.*)` sets it to None
+    match_front = None
+    # the most tokens a line may split into; beyond it, tokenizing raises a
+    # TransformerException where the recursive tokenizer this one replaced ran
+    # out of stack. Set it on Transformer, or on one transformer class, to
+    # change the limit
+    max_tokens = 1000
+    # a regex every line holds (re.search) that has a token _extract() matches;
+    # FusedEvaluator probes lines with it, or with the markers if it is None
+    probe_regex = None
+    # True if _value_evaluate() writes only the leaf it evaluates
+    local_edits = False
+
 
     def __init__(self, odict_or_tree=None):
         odict_or_tree = OrderedDict() if not odict_or_tree else odict_or_tree
@@ -32,9 +54,26 @@ class Transformer(AbstractEvaluator):
         # skip this nodes for a specific reason
         return False
 
+    def _is_literal(self, value):
+        '''True if value is a str, or a list of single-line strs, without anything _extract() could match'''
+        _probe_regex = self.probe_regex
+        if _probe_regex is None:
+            if self.markers is None:
+                return False
+            _probe_regex = '|'.join(map(re.escape, self.markers))
+        _pattern = _PROBE_PATTERNS.get(_probe_regex)
+        if _pattern is None:
+            _pattern = _PROBE_PATTERNS[_probe_regex] = re.compile(_probe_regex)
+        if type(value) is str:
+            return _pattern.search(value) is None
+        if type(value) is list:
+            return all(type(_item) is str and '\n' not in _item and _pattern.search(_item) is None
+                       for _item in value)
+        return False
+
     def _tokenize(self, expression, pieces=None):
         '''
-        tokenize an expression recursively, splitting it by presence of the first match of re_matcher expression
+        tokenize an expression, splitting it repeatedly at the first match of self._match()
         turn a line into a list of tokens
         '''
         if DEBUG.Transformer:
@@ -48,24 +87,84 @@ class Transformer(AbstractEvaluator):
 
         pieces = pieces if pieces is not None else []
 
-        _match = self._match(expression)
-        if _match:
-            if DEBUG.Transformer:
-                ic(_match.groups())
-
-            _front, _match, _back = _match.groups()
-            if _match == '':
-                pieces.append(expression)
-            if _front != '':
-                pieces.append(_front)
-
-            pieces.append(_match)
-            if _back != '':
-                self._tokenize(_back, pieces)
+        if self.match_front is not None and '\n' not in expression:
+            # on a single line the (.*) tail of _match() always matches the rest,
+            # so matching (front)(token) from each token's end splits it the same way
+            _key = (self.match_front, self.match_regex)
+            _pattern = _TOKEN_PATTERNS.get(_key)
+            if _pattern is None:
+                _pattern = _TOKEN_PATTERNS[_key] = re.compile(f'({self.match_front})({self.match_regex})')
+            _match_at = _pattern.match
+            _end = len(expression)
+            _position = 0
+            while _position < _end:
+                _match = _match_at(expression, _position)
+                if _match is None or _match.end() == _position:
+                    # no token, or none _match() could split off without looping
+                    pieces.append(expression[_position:])
+                    break
+                _front, _token = _match.groups()
+                if _token == '':
+                    pieces.append(expression[_position:])
+                if _front != '':
+                    pieces.append(_front)
+                pieces.append(_token)
+                _position = _match.end()
+                if len(pieces) > self.max_tokens:
+                    self._too_many_tokens(expression)
         else:
-            pieces.append(expression)
+            _back = expression
+            while _back != '':
+                _match = self._match(_back)
+                if not _match:
+                    pieces.append(_back)
+                    break
+                if DEBUG.Transformer:
+                    ic(_match.groups())
+
+                _front, _token, _next_back = _match.groups()
+                if _token == '':
+                    pieces.append(_back)
+                if _front != '':
+                    pieces.append(_front)
+                pieces.append(_token)
+                if _next_back == _back:
+                    break
+                _back = _next_back
+                if len(pieces) > self.max_tokens:
+                    self._too_many_tokens(expression)
 
         if DEBUG.Transformer:
             ic(pieces)
 
         return list(pieces)
+
+    @classmethod
+    def token_cache(cls):
+        '''the TokenCache _extract_tokens() goes through, shared by the classes that tokenize alike'''
+        _cache = cls.__dict__.get('_token_cache')
+        if _cache is None:
+            _cache = TokenCache.of(cls)
+            cls._token_cache = _cache
+        return _cache
+
+    def _extract_groups(self, token):
+        '''the groups self._extract() matched in token, or None'''
+        _match = self._extract(token)
+        return _match.groups() if _match is not None else None
+
+    def _extract_tokens(self, expression):
+        '''the tokens of self._tokenize(expression), each paired with its self._extract_groups()'''
+        _cache = self.token_cache()
+        _tokens = _cache.get(expression)
+        if _tokens is None:
+            _tokens = tuple((_token, self._extract_groups(_token)) for _token in self._tokenize(expression))
+            _cache.put(expression, _tokens)
+        elif len(_tokens) > self.max_tokens:
+            # cached before max_tokens was lowered
+            self._too_many_tokens(expression)
+        return _tokens
+
+    def _too_many_tokens(self, expression):
+        raise TransformerException(
+            f'more than {self.max_tokens} tokens in {expression[:80]!r}...; is a substitution circular?')
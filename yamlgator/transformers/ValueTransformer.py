@@ -11,6 +11,8 @@ class ValueTransformerException(Exception):
 
 class ValueTransformer(KeyChainTransformer):
     name = 'transform_values'
+    local_edits = True
+
     def _do_not_evaluate(self, value, keychain):
         if keychain and keychain[-1].startswith('_'):
             if DEBUG.ValueTransformer:
@@ -28,6 +30,11 @@ class ValueTransformer(KeyChainTransformer):
         if self._do_not_evaluate(value, keychain):
             return
 
+        # most leaves are literals: they are neither tokenized nor written back
+        if self._is_literal(value):
+            return
+        _value = value
+
         if not isinstance(value, list):
             _tmp_values = [str(value)]
         else:
@@ -45,7 +52,7 @@ class ValueTransformer(KeyChainTransformer):
         _are_list_values = False
 
         for _i, _tmp_value in enumerate(_tmp_values):
-            _tokenized_lines = list(map(lambda x: self._tokenize(x), _tmp_value.split('\n')))
+            _tokenized_lines = list(map(lambda x: self._extract_tokens(x), _tmp_value.split('\n')))
 
             # if DEBUG.ValueTransformer:
             #     ic(_tmp_value)
@@ -54,22 +61,19 @@ class ValueTransformer(KeyChainTransformer):
             _transformed_lines = []
             for _tokenized_line in _tokenized_lines:
                 _transformed_line = []
-                for _token in _tokenized_line:
+                for _token, _groups in _tokenized_line:
 
                     # if DEBUG.ValueTransformer:
                     #     ic(_token)
 
                     _transformed_token = _token
-                    # ------------------------------
-                    _extract = self._extract(_token)
-                    # ------------------------------
                     if DEBUG.ValueTransformer:
-                        ic(_extract.groups()) if _extract else None
+                        ic(_groups) if _groups else None
                     # MUST reset this!
                     _are_tree_values = False
                     _are_list_values = False
-                    if _extract is not None:
-                        _transformed_token = self._transform(_extract.groups(), keychain)
+                    if _groups is not None:
+                        _transformed_token = self._transform(_groups, keychain)
 
                         if DEBUG.ValueTransformer:
                             ic(_transformed_token)
@@ -77,8 +81,7 @@ class ValueTransformer(KeyChainTransformer):
                     if _transformed_token is None:
                         _transformed_token = _token
                     elif isinstance(_transformed_token, Tree):
-                        # we need to recreate Tree objects from str reps when we self.get() below on transformed values
-                        # this works but is awkward
+                        # the Tree is carried as it is; below it is overlaid, or dumped into the line
                         _are_tree_values = True
                     elif isinstance(_transformed_token, list):
                         _are_list_values = True
@@ -96,9 +99,15 @@ class ValueTransformer(KeyChainTransformer):
                             ic(_msg)
                             ic(_transformed_token)
                         _transformed_token = _token
-                    # make sure we append strings
-                    _transformed_line.append(str(_transformed_token))
-                _transformed_lines.append(''.join(_transformed_line))
+                    elif not isinstance(_transformed_token, str):
+                        # make sure we append strings
+                        _transformed_token = str(_transformed_token)
+                    _transformed_line.append(_transformed_token)
+                if len(_transformed_line) == 1 and isinstance(_transformed_line[0], Tree):
+                    # a line that is only a Tree substitution stays a Tree
+                    _transformed_lines.append(_transformed_line[0])
+                else:
+                    _transformed_lines.append(''.join(map(str, _transformed_line)))
             for _line in _transformed_lines:
                 _transformed_values.append(_line)
 
@@ -114,8 +123,7 @@ class ValueTransformer(KeyChainTransformer):
             try:
                 # note how this handles lists of trees elegantly
                 # TODO: but it overwrites existing trees and does not overlay them!
-                _t = Tree()
-                _trees = list(map(lambda x: _t.load(io.StringIO(x)), _transformed_values))
+                _trees = list(map(self._parsed_tree, _transformed_values))
                 if DEBUG.ValueTransformer:
                     ic(_trees)
                     ic(keychain)
@@ -131,14 +139,62 @@ class ValueTransformer(KeyChainTransformer):
                 if DEBUG.ValueTransformer:
                     ic(e)
         elif _are_list_values:
-            _lists = list(map(ast.literal_eval,_transformed_values))
+            # a line that is only a Tree substitution is its dump here
+            _lists = list(map(ast.literal_eval,map(str, _transformed_values)))
             if len(_lists) > 1:
                 raise ValueTransformerException("Nested lists cannot be substituted")
             value = _lists[0]
         else:
+            _transformed_values = list(map(str, _transformed_values))
             if isinstance(value, list):
                 value = _transformed_values
             else:
                 value = '\n'.join(_transformed_values)
 
+        # nor is a value no token changed
+        if type(value) is type(_value) and value == _value:
+            return
+        if self._substitutes_keychains() and self.context is None and not self._is_literal(value):
+            self._check_circular(value, keychain)
         self.get([''] + keychain, value)
+
+    def _substitutes_keychains(self):
+        # the tokens of subclasses with a _transform() of their own are not keychains
+        return type(self)._transform is KeyChainTransformer._transform
+
+    def _check_circular(self, value, keychain):
+        '''raise if a token left in value refers to the node at keychain it is written to'''
+        # unresolved tokens are carried along each pass, so the tokens of a
+        # circular substitution come back to one of the nodes they refer to
+        for _line in (value if isinstance(value, list) else value.split('\n')):
+            for _token, _groups in self._extract_tokens(str(_line)):
+                if _groups is not None and self._refers_to(_groups) == [''] + keychain:
+                    raise TransformerException(f'circular substitution: {_token} refers back to /{"/".join(keychain)}')
+
+    def _refers_to(self, groups):
+        '''the absolute keychain get() resolves the keychain of a token to, None if it is looked up elsewhere'''
+        _keychain_param, _data_index = groups
+        if _data_index and not re.match(REGEXES.SLICE, _data_index):
+            # looked up in a local context
+            return None
+        _keychain = [_key for _key in _keychain_param.split('/')]
+        if len(_keychain) > 1 and _keychain[-1] == '':
+            _keychain.pop()
+        if _keychain[0] == '':
+            return _keychain
+        try:
+            _dfs_keychain, _ = self.dfs(_keychain[0])
+        except KeyError:
+            # get() assumes the keychain is absolute
+            return [''] + _keychain
+        return _dfs_keychain + _keychain[1:]
+
+    @staticmethod
+    def _parsed_tree(transformed_value):
+        '''the Tree Tree.load() parses from a transformed value, copied without the YAML text if it is a Tree'''
+        if isinstance(transformed_value, Tree):
+            _odict = transformed_value._stringified_odict()
+            if _odict is not None:
+                return Tree(_odict)
+            transformed_value = str(transformed_value)
+        return Tree.load(io.StringIO(transformed_value))
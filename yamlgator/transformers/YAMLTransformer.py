@@ -12,7 +12,8 @@ class YAMLTransformer(PathValueTransformer):
     name = 'transform_yaml'
     ext = 'yaml'
 
-    def __init__(self, odict_or_yamlator_or_tree, context_tree=None, allow_tree_subs=False, root_dir=None):
+    def __init__(self, odict_or_yamlator_or_tree, context_tree=None, allow_tree_subs=False, root_dir=None,
+                 file_cache=None, read_paths=None):
 
         if hasattr(odict_or_yamlator_or_tree, 'root_dir') and root_dir is None:
             self.root_dir = odict_or_yamlator_or_tree.root_dir
@@ -20,7 +21,7 @@ class YAMLTransformer(PathValueTransformer):
             root_dir = pathlib.Path('.') if root_dir is None else root_dir
             self.root_dir = pathlib.Path(root_dir).absolute()
 
-        super(YAMLTransformer, self).__init__(odict_or_yamlator_or_tree)
+        super(YAMLTransformer, self).__init__(odict_or_yamlator_or_tree, file_cache=file_cache, read_paths=read_paths)
 
     def select(self, stream, keychain):
 
@@ -31,6 +32,17 @@ class YAMLTransformer(PathValueTransformer):
                 ic(keychain)
             return None
 
+        if self.file_cache is not None:
+            _document = self.file_cache.load_settled_yaml(stream, self.markers)
+            if _document is not None:
+                # a file without selectors of its own needs no evaluation: select
+                # from the shared parse and copy just the selection
+                try:
+                    _value = Tree(_document).get(keychain)
+                except KeyError:
+                    return
+                return _value.copy() if isinstance(_value, Tree) else deepcopy(_value)
+
         _stream_path = pathlib.Path(stream.name)
         if DEBUG.YAMLTransformer:
             ic()
@@ -38,10 +50,12 @@ class YAMLTransformer(PathValueTransformer):
             ic(_stream_path)
         if _stream_path.absolute():
             _new_root_dir = _stream_path.parent
-            _yt = YAMLTransformer(Tree.load(stream),root_dir=_new_root_dir)
+            _yt = YAMLTransformer(self._load_tree(stream),root_dir=_new_root_dir,
+                                  file_cache=self.file_cache, read_paths=self.read_paths)
         else:
             _new_root_dir = _stream_path.parent.relative_to(self.root_dir)
-            _yt = YAMLTransformer(Tree.load(stream),self.root_dir.joinpath(_new_root_dir))
+            _yt = YAMLTransformer(self._load_tree(stream),self.root_dir.joinpath(_new_root_dir),
+                                  file_cache=self.file_cache, read_paths=self.read_paths)
 
         if DEBUG.YAMLTransformer:
             ic(_new_root_dir)
@@ -20,6 +20,7 @@ class DEBUG:
 
 
 from .Transformer import Transformer,TransformerException
+from .TokenCache import TokenCache
 from .KeyTransformer import KeyTransformer,KeyTransformerUtility
 from .YAMLTransformer import YAMLTransformer,YAMLTransformerUtility
 from .AtTransformer import AtTransformer,AtTransformerUtility
@@ -33,8 +33,455 @@ class TreeCreationException(TreeException):
     pass
 
 
+class TreeKeyIndex:
+    """An index of key names to the absolute keychains of the nodes holding them.
+
+    The index mirrors what `Tree.visit` can reach: only `OrderedDict` values are
+    descended into. Keychains are stored as tuples without the leading root ''.
+
+    Mutations made through `Tree.get`, `Tree.pop`, `Tree.reset` and
+    `Tree.overlay` keep the index current, as does an evaluator that rewrites
+    the keys of the branch it is handed (see `AbstractEvaluator`). Anything
+    else that edits the underlying OrderedDicts directly must call
+    `invalidate()`. A stale index is rebuilt from the root on its next lookup,
+    so every lookup finds the same deepest match as a walk of the whole tree.
+    Edits the index was told about are counted in `edits`.
+    """
+    def __init__(self, odict):
+        self.odict = odict
+        self.keychains = {}
+        self.stale = True
+        self.edits = 0
+
+    def rebuild(self):
+        self.keychains = {}
+        self.stale = False
+        self._update((), self.odict, self._add)
+
+    def invalidate(self):
+        self.stale = True
+        self.edits += 1
+
+    def insert(self, keychain, value):
+        self.edits += 1
+        if not self.stale:
+            self._update(tuple(keychain), value, self._add)
+
+    def remove(self, keychain, value):
+        self.edits += 1
+        if not self.stale:
+            self._update(tuple(keychain), value, self._discard)
+
+    def find(self, key):
+        if self.stale:
+            self.rebuild()
+        return self.keychains.get(key, ())
+
+    def node(self, keychain):
+        _node = self.odict
+        for _key in keychain:
+            _node = _node[_key]
+        return _node
+
+    def _add(self, keychain):
+        self.keychains.setdefault(keychain[-1], set()).add(keychain)
+
+    def _discard(self, keychain):
+        _keychains = self.keychains.get(keychain[-1])
+        if _keychains is not None:
+            _keychains.discard(keychain)
+            if not _keychains:
+                del self.keychains[keychain[-1]]
+
+    def _update(self, keychain, value, update):
+        if keychain:
+            update(keychain)
+        _stack = [(keychain, value)]
+        while _stack:
+            _keychain, _node = _stack.pop()
+            if not isinstance(_node, OrderedDict):
+                continue
+            for _key, _child in _node.items():
+                _child_keychain = _keychain + (_key,)
+                update(_child_keychain)
+                _stack.append((_child_keychain, _child))
+
+
+class TreeFingerprints:
+    """Content digests of the branches of a tree, cached per branch.
+
+    A branch's digest covers its keys in order and the digests of its values,
+    so two branches with the same digest hold the same content. Digests are
+    computed on demand and kept until a mutation under the branch drops them;
+    `digest()` of the root after a few edits only rehashes the branches on the
+    paths to those edits.
+
+    The same per-branch entries remember which branches a `visit` with
+    `skip_settled` found settled: no key or leaf in them holds any of the
+    given marker substrings. Edits under a branch unsettle it again. The
+    leaves such a visit found settled, i.e. known literals, are remembered in
+    the entry of their branch until they are written, so later walks skip
+    them without searching them for the markers again.
+
+    Mutations made through `Tree.get`, `Tree.pop`, `Tree.reset` and
+    `Tree.overlay` invalidate the keychains they write to. Anything that edits
+    the underlying OrderedDicts directly must call `invalidate()` with the
+    keychain of the edited branch. Invalidated keychains are collected in
+    `dirty` until `clear_dirty()`.
+    """
+    def __init__(self, odict, branch_type=OrderedDict):
+        self.odict = odict
+        self.branch_type = branch_type
+        # [digest or None, {key: entry of the child branch}, markers it is settled for or None,
+        #  {key: markers the child leaf is settled for}]
+        self.entries = [None, {}, None, {}]
+        self.dirty = set()
+        self.edits = 0
+        # the markers AbstractEvaluator.evaluate() skips settled nodes for
+        self.settle_markers = None
+
+    def locate(self, keychain):
+        # the node at keychain and its entry, None if the node is not a branch
+        _node = self.odict
+        _entry = self.entries
+        for _key in keychain:
+            _node = _node[_key]
+            if not isinstance(_node, self.branch_type):
+                _entry = None
+            elif _entry is not None:
+                _child_entry = _entry[1].get(_key)
+                if _child_entry is None:
+                    _child_entry = _entry[1][_key] = [None, {}, None, {}]
+                _entry = _child_entry
+        if _entry is None or not isinstance(_node, self.branch_type):
+            return _node, None
+        return _node, _entry
+
+    def digest(self, keychain=()):
+        _node, _entry = self.locate(keychain)
+        if _entry is None:
+            return self._leaf_digest(_node)
+        return self._digest(_node, _entry)
+
+    def invalidate(self, keychain=None):
+        if keychain is None:
+            keychain = ()
+        keychain = tuple(keychain)
+        self.dirty.add(keychain)
+        self.edits += 1
+        if not keychain:
+            self.entries = [None, {}, None, {}]
+            return
+        _entry = self.entries
+        for _key in keychain[:-1]:
+            _entry[0] = _entry[2] = None
+            _entry = _entry[1].get(_key)
+            if _entry is None:
+                return
+        _entry[0] = _entry[2] = None
+        _entry[1].pop(keychain[-1], None)
+        _entry[3].pop(keychain[-1], None)
+
+    def clear_dirty(self):
+        # the topmost invalidated keychains, sorted
+        _dirty = self.dirty
+        self.dirty = set()
+        return self.topmost(_dirty)
+
+    @staticmethod
+    def topmost(keychains):
+        # the keychains of a set not below another one of it, sorted
+        return sorted((_keychain for _keychain in keychains
+                       if not any(_keychain[:_i] in keychains for _i in range(len(_keychain)))),
+                      key=lambda _keychain: [str(_key) for _key in _keychain])
+
+    @staticmethod
+    def settled_leaf(value, markers):
+        # a str without markers, or a list of them without line breaks, is left
+        # as it is by every transformer that only acts on those markers
+        if type(value) is str:
+            return not any(_marker in value for _marker in markers)
+        if type(value) is list:
+            return all(type(_item) is str and '\n' not in _item and not any(_marker in _item for _marker in markers)
+                       for _item in value)
+        return False
+
+    def settled_branch(self, node, entry, markers):
+        for _key, _value in node.items():
+            if type(_key) is not str or any(_marker in _key for _marker in markers):
+                return False
+            if isinstance(_value, self.branch_type):
+                _child_entry = entry[1].get(_key)
+                if _child_entry is None or _child_entry[2] != markers:
+                    return False
+            elif entry[3].get(_key) != markers and not self.settled_leaf(_value, markers):
+                return False
+        return True
+
+    def _digest(self, node, entry):
+        if entry[0] is not None:
+            return entry[0]
+        _stack = [(node, entry, iter(node.items()), hashlib.blake2b(digest_size=16))]
+        while True:
+            _node, _entry, _items, _hash = _stack[-1]
+            for _key, _value in _items:
+                _hash.update(self._leaf_bytes(_key))
+                if isinstance(_value, self.branch_type):
+                    _child = _entry[1].get(_key)
+                    if _child is None:
+                        _child = _entry[1][_key] = [None, {}, None, {}]
+                    if _child[0] is None:
+                        _stack.append((_value, _child, iter(_value.items()), hashlib.blake2b(digest_size=16)))
+                        break
+                    _hash.update(b'{')
+                    _hash.update(_child[0])
+                else:
+                    _hash.update(self._leaf_bytes(_value))
+            else:
+                _stack.pop()
+                _entry[0] = _hash.digest()
+                if not _stack:
+                    return _entry[0]
+                _stack[-1][3].update(b'{')
+                _stack[-1][3].update(_entry[0])
+
+    @classmethod
+    def _leaf_digest(cls, value):
+        return hashlib.blake2b(cls._leaf_bytes(value), digest_size=16).digest()
+
+    @staticmethod
+    def _leaf_bytes(value):
+        # type-tagged and length-prefixed, so no two leaves run together
+        if type(value) is str:
+            _bytes = value.encode('utf-8', 'surrogatepass')
+            return b'"%d:' % len(_bytes) + _bytes
+        _bytes = f'{type(value).__qualname__}:{value!r}'.encode('utf-8', 'surrogatepass')
+        return b'<%d:' % len(_bytes) + _bytes
+
+
+class KeychainView(list):
+    """The keychain handed to visit callbacks.
+
+    A single instance is shared by every callback of a traversal and is
+    updated in place as the traversal moves, so a callback that wants to keep
+    (or modify) its keychain must take a `copy()` of it, which is a plain list.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('visit keychains are read-only; copy() the keychain to keep or modify it')
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return deepcopy(list(self), memo)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+_END = object()
+
+# Tree._dumper() classes by (Dumper, branch type)
+_DUMPERS = {}
+# Tree._loader() classes by Loader
+_LOADERS = {}
+
+# immutable leaf types a copy can share with the original; branches never are
+_ATOMIC_TYPES = frozenset((str, bytes, int, float, complex, bool, type(None)))
+
+
+class TreeCursor:
+    """A resumable depth-first walk of a tree.
+
+    The cursor keeps the walk's stack of (branch, child key iterator) frames
+    between calls to `walk`: when a callback raises, the next `walk` picks up
+    after the subtree of the node whose callback raised. `seek` moves the
+    cursor straight to a node in O(depth); the walk then covers only that
+    node's subtree.
+    """
+    def __init__(self, tree, reverse=False, copy_keychains=False, skip_settled=None):
+        self.tree = tree
+        self.reverse = reverse
+        self.copy_keychains = copy_keychains
+        # settled nodes are only known to a forward walk of a tree caching fingerprints
+        self.skip_settled = tuple(skip_settled) \
+            if skip_settled is not None and not reverse and tree._fingerprints is not None else None
+        self.keychain = KeychainView()
+        self._stack = []
+        self._start = _END
+        self._depth = 0
+        self.seek([])
+
+    def seek(self, keychain):
+        """Positions the cursor at the node at keychain.
+
+        Args:
+            keychain (list[str]): A keychain relative to the root of the tree,
+                without the leading ''.
+
+        Returns:
+            bool: False if there is no node at keychain, in which case the
+            cursor is exhausted.
+        """
+        if _DEBUG.ENTRY:
+            ic(keychain)
+        _node = self.tree.odict
+        for _key in keychain:
+            if not isinstance(_node, self.tree._branch_type) or _key not in _node:
+                self._position(_END, [])
+                return False
+            _node = _node[_key]
+        self._position(_node, keychain)
+        return True
+
+    def _position(self, node, keychain):
+        list.clear(self.keychain)
+        list.extend(self.keychain, keychain)
+        self._stack = []
+        self._start = node
+        self._depth = len(keychain)
+
+    @property
+    def exhausted(self):
+        return self._start is _END and not self._stack
+
+    def _child_keys(self, node):
+        # a forward walk iterates the live keys, a reverse one a snapshot
+        return iter(node.keys()) if not self.reverse else reversed(list(node.keys()))
+
+    def walk(self, pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None):
+        """Runs the visit callbacks from the cursor position to the end of the walk.
+
+        Callbacks share the cursor's read-only keychain, updated in place,
+        unless the cursor was made with copy_keychains.
+        """
+        if self.skip_settled is not None:
+            return self._walk_unsettled(pre_process,post_process,value_process)
+
+        _keychain = self.keychain
+        _stack = self._stack
+        _branch_type = self.tree._branch_type
+        _copy_keychains = self.copy_keychains
+        _child_keys = self._child_keys
+
+        # a callback that raised may have left the keychain deeper than the stack
+        list.__delitem__(_keychain, slice(self._depth + max(len(_stack) - 1, 0), None))
+
+        if self._start is not _END:
+            _node = self._start
+            self._start = _END
+            if isinstance(_node,_branch_type):
+                pre_process(_node,_keychain if not _copy_keychains else list(_keychain))
+                _stack.append((_node,_child_keys(_node)))
+            else:
+                value_process(_node,_keychain if not _copy_keychains else list(_keychain))
+
+        while _stack:
+            _node, _keys = _stack[-1]
+            _child_key = next(_keys,_END)
+            if _child_key is _END:
+                _stack.pop()
+                post_process(_node,_keychain if not _copy_keychains else list(_keychain))
+                if _stack:
+                    list.pop(_keychain)
+                continue
+
+            list.append(_keychain,_child_key)
+            _child = _node.get(_child_key)
+            if isinstance(_child,_branch_type):
+                pre_process(_child,_keychain if not _copy_keychains else list(_keychain))
+                _stack.append((_child,_child_keys(_child)))
+            else:
+                value_process(_child,_keychain if not _copy_keychains else list(_keychain))
+                list.pop(_keychain)
+
+    def _walk_unsettled(self, pre_process, post_process, value_process):
+        # walk() that skips settled leaves and branches, and marks the branches
+        # it finds settled after their callbacks ran; frames are
+        # [branch, child key iterator, entry, edits when entered, unsettled child seen]
+        _keychain = self.keychain
+        _stack = self._stack
+        _branch_type = self.tree._branch_type
+        _copy_keychains = self.copy_keychains
+        _fingerprints = self.tree._fingerprints
+        _markers = self.skip_settled
+        _settled_leaf = _fingerprints.settled_leaf
+
+        list.__delitem__(_keychain, slice(self._depth + max(len(_stack) - 1, 0), None))
+
+        if self._start is not _END:
+            _node = self._start
+            self._start = _END
+            if isinstance(_node,_branch_type):
+                _, _entry = _fingerprints.locate(_keychain)
+                if _entry is None or _entry[2] != _markers:
+                    pre_process(_node,_keychain if not _copy_keychains else list(_keychain))
+                    _stack.append([_node,iter(_node.keys()),_entry,_fingerprints.edits,False])
+            elif not _settled_leaf(_node,_markers):
+                value_process(_node,_keychain if not _copy_keychains else list(_keychain))
+
+        while _stack:
+            _frame = _stack[-1]
+            _node, _keys, _entry = _frame[0], _frame[1], _frame[2]
+            _child_key = next(_keys,_END)
+            if _child_key is _END:
+                _stack.pop()
+                post_process(_node,_keychain if not _copy_keychains else list(_keychain))
+                # trust what the walk saw only if nothing was edited meanwhile
+                _settled = _entry is not None and not _frame[4] and (
+                    _frame[3] == _fingerprints.edits and all(
+                        type(_key) is str and not any(_marker in _key for _marker in _markers) for _key in _node)
+                    or _fingerprints.settled_branch(_node,_entry,_markers))
+                if _settled:
+                    _entry[2] = _markers
+                if _stack:
+                    if not _settled:
+                        _stack[-1][4] = True
+                    list.pop(_keychain)
+                continue
+
+            list.append(_keychain,_child_key)
+            _child = _node.get(_child_key)
+            if isinstance(_child,_branch_type):
+                _child_entry = None
+                if _entry is not None:
+                    _child_entry = _entry[1].get(_child_key)
+                    if _child_entry is None:
+                        _child_entry = _entry[1][_child_key] = [None, {}, None, {}]
+                    elif _child_entry[2] == _markers:
+                        list.pop(_keychain)
+                        continue
+                pre_process(_child,_keychain if not _copy_keychains else list(_keychain))
+                _stack.append([_child,iter(_child.keys()),_child_entry,_fingerprints.edits,False])
+            else:
+                # leaves known to be literals are skipped without searching them
+                _literals = _entry[3] if _entry is not None else None
+                if _literals is not None and _literals.get(_child_key) == _markers:
+                    pass
+                elif _settled_leaf(_child,_markers):
+                    if _literals is not None:
+                        _literals[_child_key] = _markers
+                else:
+                    value_process(_child,_keychain if not _copy_keychains else list(_keychain))
+                    if not _settled_leaf(_node.get(_child_key),_markers):
+                        _frame[4] = True
+                list.pop(_keychain)
+
+
 class Tree:
+    _key_index = None
+    _fingerprints = None
+    # the node type visit descends into; everything else is a leaf value
+    _branch_type = OrderedDict
+
     def __eq__(self, other):
+        if self.odict is other.odict:
+            return True
+        # digests can not decide equality: leaves 1 and 1.0 digest differently
+        # but are equal, two nan leaves digest alike but are not
         if self.odict == other.odict:
             return True
         return False
@@ -62,6 +509,9 @@ class Tree:
             self.odict = odict_or_tree
         elif issubclass(odict_or_tree.__class__,Tree):
             self.odict = odict_or_tree.odict
+            # wrappers of the same odict share its key index and fingerprints
+            self._key_index = odict_or_tree._key_index
+            self._fingerprints = odict_or_tree._fingerprints
         elif isinstance(odict_or_tree,str):
             self.odict = Tree.load(io.StringIO(odict_or_tree)).odict
         elif isinstance(odict_or_tree,dict):
@@ -78,10 +528,202 @@ class Tree:
     def copy(self):
         """Copies the Tree object.
 
+        Every branch is rebuilt, so a copy takes time and memory in proportion
+        to the size of the tree; no subtree is shared with the original.
+
+        Returns:
+             Tree: A deepcopy of the Tree object. Immutable leaf values are
+             shared with the original rather than copied.
+        """
+        return Tree(self._copy_odict())
+
+    def _copy_odict(self):
+        # deepcopy(self.odict) without the per-node overhead of deepcopy: only
+        # the branches are rebuilt, str/int/... leaves are shared and any other
+        # leaf is deep-copied with a common memo, so aliasing is preserved
+        _memo = {}
+        _odict_copy = _memo[id(self.odict)] = OrderedDict()
+        _stack = [(self.odict,_odict_copy)]
+        while _stack:
+            _node, _node_copy = _stack.pop()
+            for _key, _value in _node.items():
+                if type(_value) in _ATOMIC_TYPES:
+                    _node_copy[_key] = _value
+                elif type(_value) is OrderedDict:
+                    _value_copy = _memo.get(id(_value))
+                    if _value_copy is None:
+                        _value_copy = _memo[id(_value)] = OrderedDict()
+                        _stack.append((_value,_value_copy))
+                    _node_copy[_key] = _value_copy
+                else:
+                    _node_copy[_key] = deepcopy(_value,_memo)
+        return _odict_copy
+
+    def _stringified_odict(self):
+        # what Tree.load(io.StringIO(self.dump())) parses, without the text in
+        # between: leaves become strings as dump() makes them, branches without
+        # leaves are dropped and every branch is a new OrderedDict. None if the
+        # tree holds a key or branch the text would not bring back as it is
+        _branch_type = self._branch_type
+        _branch_types = (OrderedDict, _branch_type)
+
+        def _copy(node):
+            _node_copy = OrderedDict()
+            for _key, _value in node.items():
+                if type(_key) is not str:
+                    return None
+                if isinstance(_value, _branch_type):
+                    if type(_value) not in _branch_types:
+                        return None
+                    _value_copy = _copy(_value)
+                    if _value_copy is None:
+                        return None
+                    if _value_copy:
+                        _node_copy[_key] = _value_copy
+                elif isinstance(_value, list):
+                    _node_copy[_key] = list(map(str, _value))
+                else:
+                    _node_copy[_key] = str(_value.decode() if isinstance(_value, bytes) else _value)
+            return _node_copy
+
+        if type(self.odict) not in _branch_types:
+            return None
+        return _copy(self.odict)
+
+    def index_keys(self, enable=True):
+        """Maintains an index of key names for relative lookups.
+
+        With the index enabled, `dfs` (and so every relative `get`) resolves a
+        key with a dictionary lookup instead of a visit of the whole tree. The
+        index is shared with every Tree wrapping the same odict and is kept
+        current by `get`, `pop`, `reset` and `overlay`; edits made to the
+        OrderedDicts directly must be reported with `_on_invalidate()`.
+
+        Args:
+            enable (bool, optional): If False, drop the index. Defaults to True.
+
         Returns:
-             Tree: A deepcopy of the Tree object.
+            None
         """
-        return Tree(deepcopy(self.odict))
+        if not enable:
+            self._key_index = None
+            return
+        if self._key_index is None or self._key_index.odict is not self.odict:
+            self._key_index = TreeKeyIndex(self.odict)
+        self._key_index.invalidate()
+
+    def cache_fingerprints(self, enable=True):
+        """Keeps content digests of the branches of the tree between edits.
+
+        With the cache enabled, `fingerprint()` only rehashes the branches on
+        the paths to edits made since its last call and `changed_keychains()`
+        reports the subtrees edited since its last call. The cache is shared
+        with every Tree wrapping the same odict and is kept current by `get`,
+        `pop`, `reset` and `overlay`; edits made to the OrderedDicts directly
+        must be reported with `_on_invalidate()`.
+
+        Args:
+            enable (bool, optional): If False, drop the cache. Defaults to True.
+
+        Returns:
+            None
+        """
+        if not enable:
+            self._fingerprints = None
+            return
+        if self._fingerprints is None or self._fingerprints.odict is not self.odict:
+            self._fingerprints = TreeFingerprints(self.odict, self._branch_type)
+
+    def fingerprint(self, keychain_or_keychain_str=None):
+        """Returns a digest of the content of the tree or of one of its nodes.
+
+        Equal digests mean equal content: the same keys in the same order with
+        the same leaves. The digest is stable across processes.
+
+        Args:
+            keychain_or_keychain_str (typing.Union[str, list[str], None], optional):
+                The absolute keychain of the node to digest. Defaults to None,
+                the whole tree.
+
+        Returns:
+            str: A hexadecimal digest.
+
+        Raises:
+            KeyError: If the keychain is not in the tree.
+        """
+        _keychain = keychain_or_keychain_str or []
+        if isinstance(_keychain,str):
+            _keychain = _keychain.split('/')
+        _keychain = [_key for _key in _keychain if _key != '']
+        _fingerprints = self._fingerprints
+        if _fingerprints is None:
+            _fingerprints = TreeFingerprints(self.odict, self._branch_type)
+        return _fingerprints.digest(_keychain).hex()
+
+    def changed_keychains(self):
+        """Lists the subtrees edited since the last call.
+
+        Only the topmost edited keychains are listed; an edit to the root lists
+        just the root. Edits are recorded while `cache_fingerprints()` is on.
+
+        Returns:
+            list[list[str]]: Absolute keychains, each starting with the root ''.
+
+        Raises:
+            TreeException: If fingerprints are not cached.
+        """
+        if self._fingerprints is None:
+            raise TreeException('changed_keychains() needs cache_fingerprints()')
+        return [[''] + list(_keychain) for _keychain in self._fingerprints.clear_dirty()]
+
+    def _tracks_edits(self):
+        return self._key_index is not None or self._fingerprints is not None
+
+    def _on_insert(self, keychain, value):
+        # keychain is absolute, without the root ''
+        if self._key_index is not None:
+            self._key_index.insert(keychain, value)
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate(keychain)
+
+    def _on_remove(self, keychain, value):
+        if self._key_index is not None:
+            self._key_index.remove(keychain, value)
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate(keychain)
+
+    def _on_invalidate(self, keychain=None):
+        # the subtree at keychain was edited in place, bypassing get()
+        if self._key_index is not None:
+            self._key_index.invalidate()
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate(keychain)
+
+    def _set_keychain(self, keychain, value):
+        """Finds the topmost node that get(keychain, value) will create or replace.
+
+        Returns:
+            tuple: The keychain of that node and its current value (None when it
+            will be created), or (None, None) if get() will refuse the set.
+        """
+        _node = self.odict
+        for _i, _key in enumerate(keychain):
+            if not isinstance(_node, OrderedDict):
+                # a leaf on the path: get() walks into plain mappings and
+                # replaces anything else, but only with a truthy value
+                if not value:
+                    _leaf = _node
+                    for _leaf_key in keychain[_i:]:
+                        if not hasattr(_leaf, 'keys'):
+                            return None, None
+                        if _leaf_key not in _leaf.keys():
+                            break
+                        _leaf = _leaf[_leaf_key]
+                return keychain[:_i], _node
+            if _key not in _node:
+                return keychain[:_i + 1], None
+            _node = _node[_key]
+        return keychain, _node
 
     def reset(self, *keys_to_preserve):
         """Clears all contents of the tree, with an option to preserve branches.
@@ -109,7 +751,9 @@ class Tree:
             b:
               c: 2
         """
-        _old_tree = self.copy()
+        # clearing the root leaves its children untouched, so a shallow
+        # snapshot of the root is enough to restore the preserved branches from
+        _old_tree = Tree(OrderedDict(self.odict))
 
         if _DEBUG.RESET:
             ic()
@@ -124,6 +768,7 @@ class Tree:
             self.odict.pop(_key)
             if _DEBUG.RESET:
                 print(self.odict)
+        self._on_invalidate()
 
         for _key_to_preserve in keys_to_preserve:
             try:
@@ -143,7 +788,7 @@ class Tree:
         if _DEBUG.RESET:
             ic(self.print())
 
-    def visit(self,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,reverse=False,entry_keychain=None):
+    def visit(self,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,reverse=False,entry_keychain=None,copy_keychains=False,skip_settled=None):
         """Traverses the tree using a visitor pattern.
 
         This method walks through the entire tree, executing callbacks at
@@ -171,9 +816,20 @@ class Tree:
                 visited in reverse order. Defaults to False.
             entry_keychain (typing.Union[str, list[str]], optional): A specific
                 keychain (string or list) that defines a starting point for
-                processing. The traversal still begins at the root, but the
-                callbacks will only be activated for the target node and its
-                descendants. Defaults to None.
+                processing. The traversal goes straight to the target node and
+                only visits it and its descendants. Defaults to None.
+            copy_keychains (bool, optional): The traversal is iterative and
+                hands every callback the same read-only keychain, updated in
+                place as it moves; callbacks that keep a keychain must `copy()`
+                it. If True, each callback gets its own list instead. Defaults
+                to False.
+            skip_settled (typing.Iterable[str], optional): Marker substrings.
+                Leaves that are strings (or lists of single-line strings)
+                without any of them are not passed to `value_process`, and
+                branches whose keys and leaves are all settled that way are
+                skipped whole once a visit has seen them so and until an edit
+                reaches into them. Only honoured by forward visits of a tree
+                that caches fingerprints. Defaults to None.
 
         Raises:
             TreeVisitRestartException: A callback can raise this exception to
@@ -202,66 +858,61 @@ class Tree:
               b: 1
             c: 2
         """
-        try:
-            if not reverse:
-                self._visit(self.odict,pre_process,post_process,value_process,None,entry_keychain=entry_keychain)
-            else:
-                self._reverse_visit(self.odict,pre_process,post_process,value_process,None)
-        except TreeVisitRestartException as e:
-            if _DEBUG.VISIT or _DEBUG.ENTRY:
-                ic(e)
-                ic(self.odict)
-            if e.args[0] is not None:
-                _keychain_or_keychain_str = e.args[0]
-                _entry_keychain = copy(_keychain_or_keychain_str) if isinstance(_keychain_or_keychain_str,list) else _keychain_or_keychain_str.split('/')
-                if _DEBUG.ENTRY:
-                    ic(_entry_keychain)
-                self.visit(pre_process, post_process, value_process, reverse,entry_keychain=_entry_keychain)
-            else:
-                self.visit(pre_process, post_process, value_process, reverse)
-        except TreeVisitStopException as e:
-            if _DEBUG.VISIT:
-                ic(e)
-            return
+        _cursor = self.cursor(entry_keychain,reverse,copy_keychains,skip_settled)
+        while True:
+            try:
+                _cursor.walk(pre_process,post_process,value_process)
+                return
+            except TreeVisitRestartException as e:
+                if _DEBUG.VISIT or _DEBUG.ENTRY:
+                    ic(e)
+                    ic(self.odict)
+                _keychain_or_keychain_str = e.args[0] if e.args else None
+                if _keychain_or_keychain_str is not None:
+                    _entry_keychain = copy(_keychain_or_keychain_str) if isinstance(_keychain_or_keychain_str,list) else _keychain_or_keychain_str.split('/')
+                    if _DEBUG.ENTRY:
+                        ic(_entry_keychain)
+                    _cursor.seek(_entry_keychain)
+                else:
+                    _cursor.seek([])
+            except TreeVisitStopException as e:
+                if _DEBUG.VISIT:
+                    ic(e)
+                return
 
-    def _visit(self, node, pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,keychain=None,entry_keychain=None,process=False):
-        keychain = [] if keychain is None else keychain
-        entry_keychain = [] if entry_keychain is None else entry_keychain
-        if not entry_keychain:
-            process = True
-        elif not process and keychain[:len(entry_keychain)] == entry_keychain:
-            process = True
-            if _DEBUG.ENTRY:
-                _msg = f"{keychain[:len(entry_keychain)]} == {entry_keychain} "
-                ic(_msg)
-                ic(process)
-
-        if isinstance(node,OrderedDict):
-            if process:
-                pre_process(node,copy(keychain))
-            for _child_key in node.keys():
-                keychain.append(_child_key)
-                self._visit(node.get(_child_key), pre_process, post_process, value_process, copy(keychain),entry_keychain,process)
-                keychain.pop()
-            if process:
-                post_process(node,copy(keychain))
-        else:
-            if process:
-                value_process(node,keychain)
+    def cursor(self, entry_keychain=None, reverse=False, copy_keychains=False, skip_settled=None):
+        """Returns a resumable cursor over the tree.
 
-    def _reverse_visit(self, node,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,keychain=None):
-        keychain = [] if keychain is None else keychain
-        if isinstance(node,OrderedDict):
-            pre_process(node,copy(keychain))
-            _node_keys = copy(list(node.keys()))
-            _node_keys.reverse()
-            for _child_key in _node_keys:
-                keychain.append(_child_key)
-                self._reverse_visit(node.get(_child_key), pre_process, post_process, value_process, copy(keychain))
-                keychain.pop()
-            post_process(node,copy(keychain))
+        Args:
+            entry_keychain (typing.Union[str, list[str]], optional): The node
+                to position the cursor at. Defaults to the root.
+            reverse (bool, optional): If True, children are walked in reverse
+                order. Defaults to False.
+            copy_keychains (bool, optional): If True, callbacks get their own
+                keychain lists. Defaults to False.
+            skip_settled (typing.Iterable[str], optional): See `visit`.
+                Defaults to None.
+
+        Returns:
+            TreeCursor: A cursor whose `walk` runs the visit callbacks.
+        """
+        _cursor = TreeCursor(self,reverse,copy_keychains,skip_settled)
+        if entry_keychain:
+            _cursor.seek(copy(entry_keychain) if isinstance(entry_keychain,list) else entry_keychain.split('/'))
+        return _cursor
+
+    def _visit(self, node, pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,keychain=None,entry_keychain=None,process=False,copy_keychains=False):
+        _cursor = TreeCursor(self,False,copy_keychains)
+        if entry_keychain and not process:
+            _cursor.seek(entry_keychain)
         else:
-            value_process(node,keychain)
+            _cursor._position(node,[] if keychain is None else keychain)
+        _cursor.walk(pre_process,post_process,value_process)
+
+    def _reverse_visit(self, node,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,keychain=None,copy_keychains=False):
+        _cursor = TreeCursor(self,True,copy_keychains)
+        _cursor._position(node,[] if keychain is None else keychain)
+        _cursor.walk(pre_process,post_process,value_process)
 
     def keys(self, keychain_or_keychain_str=None):
         """Returns the keys of a node, behaving like dict.keys().
@@ -353,6 +1004,9 @@ class Tree:
 
         _all_results = []
 
+        if self._key_index is not None:
+            _all_results = self._indexed_dfs(key,_keychain_context)
+
         def _dfs(node,keychain):
             if _DEBUG.DFS:
                 ic()
@@ -378,7 +1032,8 @@ class Tree:
                     # all results are absolute!
                     _all_results.append(([''] + keychain+[_node_key],node[_node_key]))
 
-        self.visit(post_process=_dfs)
+        if self._key_index is None:
+            self.visit(post_process=_dfs)
 
         if not _all_results:
             if _DEBUG.DFS:
@@ -417,6 +1072,50 @@ class Tree:
                 ic(_msg)
             return _all_results[0]
 
+    def _indexed_dfs(self, key, keychain_context, rebuilt=False):
+        """Resolves dfs() candidates for key from the key index.
+
+        Only the match dfs() would rank first is returned: the deepest one, with
+        ties going to the first in document order, as the post-order visit did.
+        """
+        _candidates = []
+        _depth = 0
+        for _keychain in self._key_index.find(key):
+            if list(_keychain[:-1][:len(keychain_context)]) != keychain_context:
+                continue
+            if len(_keychain) > _depth:
+                _candidates = [_keychain]
+                _depth = len(_keychain)
+            elif len(_keychain) == _depth:
+                _candidates.append(_keychain)
+
+        if not _candidates:
+            return []
+
+        _positions = {}
+        def _document_position(keychain):
+            _position = []
+            _node = self.odict
+            for _key in keychain:
+                if id(_node) not in _positions:
+                    _positions[id(_node)] = {_k: _i for _i, _k in enumerate(_node.keys())}
+                _position.append(_positions[id(_node)][_key])
+                _node = _node[_key]
+            return _position
+
+        try:
+            if len(_candidates) > 1:
+                _candidates.sort(key=_document_position)
+            _keychain = _candidates[0]
+            _value = self._key_index.node(_keychain)
+        except (KeyError, TypeError, AttributeError):
+            # the tree was edited behind the index's back
+            if rebuilt:
+                raise
+            self._key_index.rebuild()
+            return self._indexed_dfs(key, keychain_context, True)
+        return [([''] + list(_keychain), _value)]
+
     def uget(self, keychain_or_keychain_str, value=None):
         """Gets a value from the tree, returning a default if the key does not exist.
 
@@ -622,6 +1321,12 @@ class Tree:
 
         _original_keychain = copy(_keychain)
 
+        _tracked_keychain = None
+        if value is not None and _absolute_keychain and self._tracks_edits():
+            _tracked_keychain, _tracked_value = self._set_keychain(_original_keychain, value)
+            if _tracked_keychain is not None:
+                self._on_remove(_tracked_keychain, _tracked_value)
+
         _keychain.reverse()
 
         if _DEBUG.GET:
@@ -826,6 +1531,12 @@ class Tree:
             else:
                 _ret = Tree(_current_node)
 
+        if _tracked_keychain is not None:
+            _tracked_value = self.odict
+            for _tracked_key in _tracked_keychain:
+                _tracked_value = _tracked_value[_tracked_key]
+            self._on_insert(_tracked_keychain, _tracked_value)
+
         return _ret
 
     def pop(self, keychain_or_keychain_str, delete_key=True, keychain_context=None):
@@ -835,6 +1546,9 @@ class Tree:
         paths (those not starting with '/'), it performs a depth-first search (DFS)
         to find the target node.
 
+        The node is deleted in place on its parent, and any branches left empty
+        by the deletion are removed with it. The rest of the tree is untouched.
+
         Args:
             keychain_or_keychain_str (typing.Union[str, list[str]]): The path to the
                 node to be removed. Can be a '/'-separated string or a list of
@@ -870,54 +1584,61 @@ class Tree:
             _trim_root = True
             _keychain.pop()
 
+        if len(_keychain) > 1 and _keychain[0] == '':
+            _absolute_keychain = _keychain
+        else:
+            try:
+                _absolute_keychain,_= self.dfs(_keychain,keychain_context)
+                if _DEBUG.POP:
+                    ic(_absolute_keychain)
+            except KeyError:
+                #???? silently fail???
+                return
+
+        if not isinstance(_absolute_keychain,list) or len(_absolute_keychain) < 2:
+            # the root itself is never popped
+            return self.get(keychain_or_keychain_str)
+
         try:
-            _absolute_keychain,_= self.dfs(_keychain,keychain_context)
-            if _DEBUG.POP:
-                ic(_absolute_keychain)
+            _value = self.get(_absolute_keychain + [''] if _trim_root else _absolute_keychain)
         except KeyError:
-            #???? silently fail???
             return
-
-        _value = self.get(keychain_or_keychain_str)
         if _DEBUG.POP:
             ic(_value)
 
-        _new_tree = Tree()
+        # delete in place on the parent; branches emptied by the pop go with it
+        _node_keychain = _absolute_keychain[1:]
+        _parents = [self.odict]
+        for _key in _node_keychain[:-1]:
+            _parents.append(_parents[-1][_key])
+        _key = _node_keychain[-1]
+        _parent = _parents[-1]
+        # get() also walks into plain dicts, which are leaves to visit() and the key index
+        _in_branches = all(isinstance(_p,OrderedDict) for _p in _parents)
+
+        if _in_branches:
+            self._on_remove(_node_keychain,_parent[_key])
         if not delete_key:
-            _new_tree.get(keychain_or_keychain_str,'')
-
-
-        for __keychain,__value in self.flatten():
             if _DEBUG.POP:
-                ic(__keychain)
-
-            if __keychain == _absolute_keychain:
-                # ic(__keychain)
-                # ic(_absolute_keychain)
-                if not delete_key:
-                    if _DEBUG.POP:
-                        _msg = f'leaving keychain {keychain_or_keychain_str}'
-                        ic(_msg)
-                    _new_tree.get(keychain_or_keychain_str,'')
-                else:
-                    if _DEBUG.POP:
-                        _msg = f'deleting keychain {keychain_or_keychain_str}'
-                        ic(_msg)
-                continue
-
-            elif __keychain[:len(_absolute_keychain)] == _absolute_keychain:
-                if not delete_key:
-                    if _DEBUG.POP:
-                        _msg = f'leaving keychain {keychain_or_keychain_str}'
-                        ic(_msg)
-                    _new_tree.get(keychain_or_keychain_str,'')
-                continue
-            else:
-                _new_tree.get(__keychain,__value)
-
-        # remove odict contents without breaking refs
-        self.reset()
-        self.overlay(_new_tree)
+                _msg = f'leaving keychain {keychain_or_keychain_str}'
+                ic(_msg)
+            _parent[_key] = ''
+            if _in_branches:
+                self._on_insert(_node_keychain,'')
+        else:
+            if _DEBUG.POP:
+                _msg = f'deleting keychain {keychain_or_keychain_str}'
+                ic(_msg)
+            del _parent[_key]
+            while not _parent and len(_parents) > 1 and isinstance(_parent,OrderedDict):
+                _parents.pop()
+                _node_keychain = _node_keychain[:-1]
+                if _in_branches:
+                    self._on_remove(_node_keychain,_parent)
+                del _parents[-1][_node_keychain[-1]]
+                _parent = _parents[-1]
+        if not _in_branches:
+            self._on_invalidate(_absolute_keychain[1:])
 
         if _DEBUG.POP:
             ic(self)
@@ -951,15 +1672,102 @@ class Tree:
         """
         if _DEBUG.FLATTEN:
             ic()
-        _data = []
-        def _val(node,keychain):
-            if not relative:
-                _data.append(([''] + keychain,node))
-            else:
-                _data.append((keychain,node))
+        return list(self.iter_flatten(relative))
+
+    def iter_flatten(self, relative: bool = False, prefix: typing.Union[str, list[str], None] = None, max_depth: typing.Optional[int] = None) -> typing.Iterator[tuple[list[str], typing.Any]]:
+        """Lazily yields the keychain-value pairs of `flatten`.
+
+        Only the keychain of the node being yielded is held, so iterating uses
+        memory in proportion to the depth of the tree, not its size.
 
-        self.visit(value_process=_val)
-        return _data
+        Args:
+            relative (bool, optional): If True, keychains do not start with the
+                root ''. Defaults to False.
+            prefix (typing.Union[str, list[str], None], optional): The absolute
+                keychain of the branch to flatten; the keychains yielded still
+                start at the root. A prefix that is not in the tree yields
+                nothing. Defaults to the root.
+            max_depth (int, optional): The number of levels below the prefix to
+                descend; branches at that depth are yielded as values.
+                Defaults to no limit.
+
+        Yields:
+            tuple[list[str], typing.Any]: A keychain and its value, in the
+            order `visit` reaches the leaves.
+
+        Examples:
+            >>> tree = Tree({'a': {'b': 'B_VAL'}, 'c': 'C_VAL'})
+            >>> list(tree.iter_flatten(prefix='a'))
+            [(['', 'a', 'b'], 'B_VAL')]
+        """
+        for _keychain, _value, _is_branch in self._iter_nodes(relative,prefix,max_depth):
+            if not _is_branch:
+                yield _keychain, _value
+
+    def iter_keys(self, relative: bool = False, prefix: typing.Union[str, list[str], None] = None, max_depth: typing.Optional[int] = None) -> typing.Iterator[list[str]]:
+        """Lazily yields the keychain of every branch and leaf, branches first.
+
+        The arguments are those of `iter_flatten`.
+        """
+        for _keychain, _value, _is_branch in self._iter_nodes(relative,prefix,max_depth):
+            yield _keychain
+
+    def iter_leaves(self, prefix: typing.Union[str, list[str], None] = None, max_depth: typing.Optional[int] = None) -> typing.Iterator[typing.Any]:
+        """Lazily yields the leaf values, in the order `visit` reaches them.
+
+        The arguments are those of `iter_flatten`.
+        """
+        for _keychain, _value, _is_branch in self._iter_nodes(True,prefix,max_depth):
+            if not _is_branch:
+                yield _value
+
+    def iter_branches(self, relative: bool = False, prefix: typing.Union[str, list[str], None] = None, max_depth: typing.Optional[int] = None) -> typing.Iterator[tuple[list[str], OrderedDict]]:
+        """Lazily yields the keychain and node of every branch below the prefix.
+
+        The arguments are those of `iter_flatten`; branches at max_depth are
+        not yielded.
+        """
+        for _keychain, _value, _is_branch in self._iter_nodes(relative,prefix,max_depth):
+            if _is_branch:
+                yield _keychain, _value
+
+    def _iter_nodes(self, relative=False, prefix=None, max_depth=None):
+        # the generator behind the iter_* methods: yields (keychain, value, is_branch)
+        # with branches before their children, walking a stack of live item iterators
+        _prefix = [] if prefix is None else copy(prefix) if isinstance(prefix,list) else prefix.split('/')
+        if _prefix and _prefix[0] == '':
+            _prefix = _prefix[1:]
+        if _prefix and _prefix[-1] == '':
+            _prefix.pop()
+        _branch_type = self._branch_type
+
+        _node = self.odict
+        for _key in _prefix:
+            if not isinstance(_node,_branch_type) or _key not in _node:
+                return
+            _node = _node[_key]
+
+        _keychain = ([] if relative else ['']) + _prefix
+        if not isinstance(_node,_branch_type):
+            yield _keychain, _node, False
+            return
+
+        _stack = [iter(_node.items())]
+        while _stack:
+            _item = next(_stack[-1],None)
+            if _item is None:
+                _stack.pop()
+                if _stack:
+                    _keychain.pop()
+                continue
+            _key, _value = _item
+            _keychain.append(_key)
+            if isinstance(_value,_branch_type) and (max_depth is None or len(_stack) < max_depth):
+                yield list(_keychain), _value, True
+                _stack.append(iter(_value.items()))
+            else:
+                yield list(_keychain), _value, False
+                _keychain.pop()
 
     def oget(self,keychain_or_keychain_str,value):
         """So we can use overlay like get in TreeState"""
@@ -967,22 +1775,31 @@ class Tree:
             return self.overlay(value,keychain_or_keychain_str)
         return self.get(keychain_or_keychain_str,value)
 
-    def overlay(self, tree: 'Tree', keychain_or_keychain_str: typing.Union[str, list[str]] = []) -> 'Tree':
+    def overlay(self, tree: 'Tree', keychain_or_keychain_str: typing.Union[str, list[str]] = [], count_changes: bool = False) -> 'Tree':
         """Merges the contents of another Tree into the current one.
 
         This method overlays the key-value pairs from the source `tree` onto the
         current tree in-place. If a key already exists in the current tree, its
         value will be overwritten with the value from the source tree.
 
+        The two trees are merged in a single walk of the source: every leaf is
+        set as `self.get(keychain + leaf_keychain, value)` would set it, but
+        existing branches are descended into once instead of once per leaf.
+
         Args:
             tree (Tree): The source `Tree` object to overlay.
             keychain_or_keychain_str (typing.Union[str, list[str]], optional): A base
                 keychain to apply the overlay. If provided, the source tree will be
                 merged at this location. If omitted, the merge happens at the root.
+                A relative base keychain is resolved once, before the merge.
                 Defaults to [].
+            count_changes (bool, optional): If True, return the number of
+                leaves that were added or changed instead of `self`.
+                Defaults to False.
 
         Returns:
             Tree: The modified `Tree` instance (`self`), allowing for method chaining.
+                An int if `count_changes` is True.
 
         Examples:
             >>> base_tree = Tree({'a': 1, 'b': {'c': 2}})
@@ -1002,6 +1819,8 @@ class Tree:
               config:
                 debug: true
                 version: '1.1'
+            >>> target_tree.overlay(new_settings, 'app/config', count_changes=True)
+            0
         """
         _keychain = copy(keychain_or_keychain_str) if isinstance(keychain_or_keychain_str,list) \
                                                     else keychain_or_keychain_str.split('/')
@@ -1009,16 +1828,107 @@ class Tree:
         _relative = False
         if keychain_or_keychain_str:
             _relative = True
+        else:
+            # leaf keychains are absolute
+            _keychain.append('')
 
-        for __keychain,__value in tree.flatten(_relative):
+        # the absolute keychain (without the root '') the source is merged at
+        _fallback_keychain = None
+        if _keychain[0] == '':
+            _base_keychain = _keychain[1:]
+        else:
+            _fallback_keychain = [''] + _keychain
+            try:
+                _dfs_keychain,_dfs_value = self.dfs(_keychain[0])
+                _base_keychain = _dfs_keychain[1:] + _keychain[1:]
+            except KeyError:
+                _base_keychain = _keychain
+                _fallback_keychain = None
+
+        if _DEBUG.OVERLAY:
+            ic(_base_keychain)
+
+        def _resolve(keychain):
+            # the branches of self along keychain; None from the first node that is not a branch
+            _nodes = []
+            _node = self.odict
+            for _key in keychain:
+                _nodes.append(_node)
+                # plain dicts are leaves to the key index, so only get() writes into them
+                _node = _node.get(_key) if isinstance(_node,OrderedDict) else None
+            _nodes.append(_node)
+            return [_n if isinstance(_n,OrderedDict) else None for _n in _nodes]
+
+        _source = tree
+        if any(_node is tree.odict for _node in _resolve(_base_keychain)):
+            # the merge would write into the branches it is reading
+            _source = Tree(tree._copy_odict())
+
+        # _targets[i] is the branch of self at _base_keychain + the first i keys of
+        # the source keychain, or None where that is not (yet) a branch
+        _targets = _resolve(_base_keychain)[-1:]
+        _changes = 0
+
+        def _pre(node,keychain):
+            if not keychain:
+                return
+            _target = _targets[-1]
+            _child = _target.get(keychain[-1]) if _target is not None else None
+            _targets.append(_child if isinstance(_child,OrderedDict) else None)
+
+        def _post(node,keychain):
+            if keychain:
+                _targets.pop()
+
+        def _value(value,keychain):
+            nonlocal _changes
             if _DEBUG.OVERLAY:
-                _msg = f"setting {'/'.join(_keychain + __keychain)} to {__value}"
+                _msg = f"setting {'/'.join(_base_keychain + keychain)} to {value}"
                 ic(_msg)
-                ic(type(__value))
+                ic(type(value))
+
+            _target = _targets[-1]
+            _key = keychain[-1]
+            if _target is not None and not isinstance(value,Tree):
+                if value is None:
+                    # get() with no value only checks the keychain exists
+                    if _key not in _target:
+                        self._overlay_get(_base_keychain + keychain,value,_fallback_keychain,keychain)
+                    return
+                _old = _target.get(_key,_END)
+                if _old is not value:
+                    if self._tracks_edits():
+                        _absolute_keychain = _base_keychain + list(keychain)
+                        if _old is not _END:
+                            self._on_remove(_absolute_keychain,_old)
+                        _target[_key] = value
+                        self._on_insert(_absolute_keychain,value)
+                    else:
+                        _target[_key] = value
+                    if _old is _END or _old != value:
+                        _changes += 1
+                return
+
+            # the path to the leaf has to be created or a leaf on it replaced
+            self._overlay_get(_base_keychain + keychain,value,_fallback_keychain,keychain)
+            if value is not None:
+                _changes += 1
+            _targets[:] = _resolve(_base_keychain + keychain[:-1])[len(_base_keychain):]
 
-            self.get(_keychain + __keychain,__value)
+        _source.visit(_pre,_post,_value)
+        if count_changes:
+            return _changes
         return self
 
+    def _overlay_get(self, keychain, value, fallback_keychain=None, leaf_keychain=None):
+        try:
+            self.get([''] + keychain,value)
+        except KeyError:
+            # a relative get() retries a keychain it cannot set at the root
+            if fallback_keychain is None:
+                raise
+            self.get(fallback_keychain + list(leaf_keychain),value)
+
     def print(self):
         """Construct a printable string representation of the tree.
 
@@ -1069,31 +1979,34 @@ class Tree:
         if _DEBUG.STRINGIFY:
             ic()
         _data_tree = Tree()
-        def _stringify(value,keychain):
+        for _keychain, _value in self.iter_flatten():
             if _DEBUG.STRINGIFY:
-                ic(keychain)
-                ic(value)
-            if isinstance(value,list):
-                _data_tree.get([''] + keychain, list(map(str, value.decode() if isinstance(value,bytes) else value)))
+                ic(_keychain)
+                ic(_value)
+            if isinstance(_value,list):
+                _data_tree.get(_keychain, list(map(str, _value.decode() if isinstance(_value,bytes) else _value)))
             else:
-                _data_tree.get([''] + keychain, str(value.decode() if isinstance(value,bytes) else value))
+                _data_tree.get(_keychain, str(_value.decode() if isinstance(_value,bytes) else _value))
 
-        self.visit(value_process=_stringify)
         return _data_tree
 
-    def dump(self,stream=None,Dumper=yaml.Dumper,**kwds):
+    def dump(self,stream=None,Dumper=DEFAULT_DUMPER,**kwds):
         """Serializes the Tree object into a YAML formatted string.
 
         This method preserves the order of keys from the original tree in the
         YAML output. It also ensures that all values within the tree are
-        converted to their string representation before being serialized.
+        converted to their string representation before being serialized,
+        as `stringify` would, but in the same pass that emits them.
 
         Args:
             stream (typing.IO, optional): A file-like object (e.g., a file
                 handle opened in write mode). If provided, the YAML output
                 will be written to this stream. Defaults to None.
             Dumper (yaml.Dumper): The yaml.Dumper class to be used for the
-                serialization process.
+                serialization process. Defaults to yaml.Dumper, whose
+                output `str()` keeps; FAST_DUMPER is libyaml's yaml.CDumper
+                when PyYAML was built with it, which emits faster but folds
+                long double-quoted scalars differently.
             **kwds: Additional keyword arguments that will be passed directly
                 to the underlying yaml.dump function.
 
@@ -1102,22 +2015,62 @@ class Tree:
             returns the YAML output as a string. If `stream` is provided,
             the method writes to the stream and returns None.
         """
-        _data_tree = self.stringify()
+        return yaml.dump(self.odict, stream, self._dumper(Dumper), **kwds)
 
-        class OrderedDumper(Dumper):
-            pass
+    @classmethod
+    def _dumper(cls, Dumper):
+        # one dumper class per Dumper and branch type, built on first use
+        _key = (Dumper, cls._branch_type)
+        _dumper = _DUMPERS.get(_key)
+        if _dumper is not None:
+            return _dumper
+
+        _branch_type = cls._branch_type
+
+        def _has_leaves(node):
+            _stack = [node]
+            while _stack:
+                for _value in _stack.pop().values():
+                    if not isinstance(_value,_branch_type):
+                        return True
+                    _stack.append(_value)
+            return False
+
+        def _stringified_items(data):
+            # what stringify() would make of the branch: leaves become strings
+            # and branches without leaves are dropped
+            for _key, _value in data.items():
+                if isinstance(_value,_branch_type):
+                    if _has_leaves(_value):
+                        yield _key, _value
+                elif isinstance(_value,list):
+                    yield _key, list(map(str, _value))
+                else:
+                    yield _key, str(_value.decode() if isinstance(_value,bytes) else _value)
 
         def _dict_representer(dumper, data):
             return dumper.represent_mapping(
                 yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-                data.items())
+                _stringified_items(data))
+
+        class OrderedDumper(Dumper):
+            def ignore_aliases(self, data):
+                # stringify() never produced shared nodes to alias
+                return True
 
         OrderedDumper.add_representer(OrderedDict, _dict_representer)
-        return yaml.dump(_data_tree.odict, stream, OrderedDumper, **kwds)
+        OrderedDumper.add_representer(_branch_type, _dict_representer)
+        _DUMPERS[_key] = OrderedDumper
+        return OrderedDumper
 
     @classmethod
-    def _load(cls, stream):
-        class OrderedLoader(yaml.BaseLoader):
+    def _loader(cls, Loader):
+        # one loader class per Loader, built on first use
+        _loader = _LOADERS.get(Loader)
+        if _loader is not None:
+            return _loader
+
+        class OrderedLoader(Loader):
             pass
         def construct_mapping(loader, node):
             return OrderedDict(loader.construct_pairs(node))
@@ -1125,10 +2078,15 @@ class Tree:
         OrderedLoader.add_constructor(
             yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
             construct_mapping)
-        return yaml.load(stream,OrderedLoader)
+        _LOADERS[Loader] = OrderedLoader
+        return OrderedLoader
+
+    @classmethod
+    def _load(cls, stream, Loader=DEFAULT_LOADER):
+        return yaml.load(stream,cls._loader(Loader))
 
     @classmethod
-    def load(cls,stream):
+    def load(cls,stream,Loader=DEFAULT_LOADER):
         """Constructs a new Tree instance from a YAML source.
 
         This factory @classmethod parses a YAML source, preserving the order of
@@ -1138,8 +2096,12 @@ class Tree:
             stream (typing.Union[typing.IO, str]): The source of the YAML data.
                 This can be a file-like object (e.g., from an open file) or a
                 string containing YAML markup.
+            Loader (yaml.BaseLoader): The loader class used to parse the
+                stream. Defaults to libyaml's yaml.CBaseLoader when PyYAML was
+                built with it, else yaml.BaseLoader. Either way all scalars
+                are loaded as strings.
 
         Returns:
             Tree: A new Tree instance populated with the data from the stream.
         """
-        return cls(cls._load(stream))
+        return cls(cls._load(stream,Loader))
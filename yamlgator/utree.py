@@ -5,6 +5,8 @@ class UnOrderedTreeException(Exception):
     pass
 
 class UTree(Tree):
+    _branch_type = dict
+
     def __init__(self, odict_or_dict_or_tree=None):
         super().__init__()
         if odict_or_dict_or_tree is None:
@@ -16,31 +18,17 @@ class UTree(Tree):
         else:
             raise UnOrderedTreeException('Cannot create tree')
 
-    def visit(self,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,reverse=False,entry_keychain=None):
+    def visit(self,pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,reverse=False,entry_keychain=None,copy_keychains=False):
         """Reverse visting is not supported for UTree objects."""
         if reverse:
             raise UnOrderedTreeException('Reverse visiting is not supported !')
         if entry_keychain:
             raise UnOrderedTreeException('Tree entry keychains are not supported !')
 
-        self._visit(self.odict, pre_process, post_process, value_process, None)
+        self._visit(self.odict, pre_process, post_process, value_process, None, copy_keychains=copy_keychains)
 
     visit.__doc__ += '\n' + Tree.visit.__doc__
 
-    def _visit(self, node, pre_process=lambda x, y:None, post_process=lambda x, y:None, value_process=lambda x, y:None,keychain=None,entry_keychain=None,process=None):
-        keychain = [] if keychain is None else keychain
-
-        if isinstance(node,dict) or isinstance(node,OrderedDict):
-            pre_process(node,copy(keychain))
-            for _child_key in node.keys():
-                keychain.append(_child_key)
-                self._visit(node.get(_child_key), pre_process, post_process, value_process, copy(keychain))
-                keychain.pop()
-            post_process(node,copy(keychain))
-
-        else:
-            value_process(node,keychain)
-
     def copy(self):
         '''return a copy of the tree'''
         return UTree(deepcopy(self.odict))
@@ -1,7 +1,9 @@
 from __future__ import annotations
+import graphlib
+
 from ..tree import Tree
 
-from ..constants import KEYCHAIN_LEFT_BOUND, KEYCHAIN_RIGHT_BOUND
+from ..constants import KEY_OR_KEYCHAIN_OP, KEYCHAIN_LEFT_BOUND, KEYCHAIN_RIGHT_BOUND
 from ..transformers import ValueTransformer
 
 class AbstractValidator(Tree):
@@ -41,6 +43,7 @@ class AbstractValidator(Tree):
             - database/url
         """
         _var_tree = self.__class__() # Use cls() for generic instantiation
+        _value_transformer = ValueTransformer()
         def _val(value, keychain):
             if not isinstance(value, str) and not isinstance(value, list):
                 return
@@ -49,9 +52,8 @@ class AbstractValidator(Tree):
             if not isinstance(value, list):
                 value = [value]
             for _value in value:
-                _tokens = ValueTransformer()._tokenize(_value)
-                for _token in _tokens:
-                    _token,_keychain = self._remove_data_index(_token)
+                for _token, _groups in _value_transformer._extract_tokens(_value):
+                    _token,_keychain = self._remove_data_index(_token,_groups)
                     # _keychain == None means _token looks like a variable but is not a value type variable
                     if not _keychain: continue
                     # we cannot use .get() here because it will parse )){a/b} like a keychain string!
@@ -99,6 +101,7 @@ class AbstractValidator(Tree):
             <BLANKLINE>
         """
         _reduced_tree = self.__class__() # Use cls() for generic instantiation
+        _value_transformer = ValueTransformer()
         def _val(value, keychain):
             if not isinstance(value, str) and not isinstance(value, list):
                 return
@@ -109,12 +112,12 @@ class AbstractValidator(Tree):
 
             _variables_in_value = []
             for _value in value:
-                _tokens = ValueTransformer()._tokenize(_value)
-                for _token in _tokens:
+                for _token, _groups in _value_transformer._extract_tokens(_value):
                     # this is bad: we want to parse ))a//b ( ))a/, /b )
                     if _token[-1] == '/':
                         _token = _token[:-1]
-                    _token,_keychain = self._remove_data_index(_token)
+                        _groups = _value_transformer._extract_groups(_token)
+                    _token,_keychain = self._remove_data_index(_token,_groups)
                     # _keychain == None means _token looks like a variable but is not a value type variable
                     if not _keychain:
                         continue
@@ -128,13 +131,111 @@ class AbstractValidator(Tree):
 
         return _reduced_tree
 
-    def _remove_data_index(self,token):
+    def schedule(self):
+        """Orders the keychains of the dependency graph for a single pass.
+
+        Each keychain of `reduce()` comes after the keychains holding the
+        values it substitutes, so evaluating them in this order resolves a
+        chain of variables in one go. A variable that names a branch depends
+        on every keychain below it. Variables that cannot be found yet, for
+        instance because an import has still to define them, add no ordering.
+
+        Returns:
+            tuple[list[list[str]], int] | None: The keychains in dependency
+                order, and an estimate of the number of passes that substitute
+                variables in document order need to resolve them, worked out
+                from the variables alone, not by running those passes. None if
+                the dependencies are circular.
+
+        Examples:
+            >>> yaml_content = '''
+            ... url: 'http://))host:))port'
+            ... host: ))domain
+            ... port: '80'
+            ... domain: example.org
+            ... '''
+            >>> yt = YAMLator.load(io.StringIO(yaml_content))
+            >>> yt.transform_values().schedule()  # the value transformer is a validator
+            ([['host'], ['url']], 2)
+        """
+        _keychains = []
+        _tokens = []
+        for _keychain, _variables in self.reduce().iter_flatten(relative=True):
+            _keychains.append(tuple(_keychain))
+            _tokens.append(_variables)
+        _positions = {_keychain: _i for _i, _keychain in enumerate(_keychains)}
+
+        # the keychains below each branch, for variables that name a branch
+        _below = {}
+        for _keychain in _keychains:
+            for _i in range(1, len(_keychain)):
+                _below.setdefault(_keychain[:_i], []).append(_keychain)
+
+        _graph = {}
+        # the variables each keychain holds, with None for those naming values without variables
+        _holds = {}
+        for _keychain, _variables in zip(_keychains, _tokens):
+            _dependencies = set()
+            _holds[_keychain] = set()
+            for _token in _variables:
+                _target = self._resolve_token(_token)
+                if _target in _positions:
+                    _dependencies.add(_target)
+                elif _target is not None:
+                    _dependencies.update(_below.get(_target, ()))
+                    _holds[_keychain].add(None)
+            _dependencies.discard(_keychain)
+            _graph[_keychain] = _dependencies
+            _holds[_keychain].update(_dependencies)
+
+        try:
+            _order = list(graphlib.TopologicalSorter(_graph).static_order())
+        except graphlib.CycleError:
+            return None
+
+        # a pass substitutes the current values, unresolved variables and all,
+        # so follow the variables each keychain holds through passes in
+        # document order until none is left
+        _passes = 0
+        while any(_holds.values()):
+            _passes += 1
+            for _keychain in _keychains:
+                if _holds[_keychain]:
+                    _holds[_keychain] = set().union(*(
+                        _holds[_dependency] for _dependency in _holds[_keychain] if _dependency is not None))
+        return [list(_keychain) for _keychain in _order], _passes
+
+    def _resolve_token(self, token):
+        # the keychain, without the root, a variable token of reduce() refers to
+        _keychain_str = token[len(KEY_OR_KEYCHAIN_OP):]
+        if _keychain_str.startswith(KEYCHAIN_LEFT_BOUND) and _keychain_str.endswith(KEYCHAIN_RIGHT_BOUND):
+            _keychain_str = _keychain_str[len(KEYCHAIN_LEFT_BOUND):-len(KEYCHAIN_RIGHT_BOUND)]
+        _keychain = _keychain_str.strip('/').split('/')
+        if _keychain == ['']:
+            return None
+        # dfs() finds the first key, whose node must hold the rest; get() falls
+        # back to an absolute keychain
+        try:
+            _found, _node = self.dfs(_keychain[:1])
+            _candidates = [(list(_found[1:]), _node, _keychain[1:]), ([], self.odict, _keychain)]
+        except KeyError:
+            _candidates = [([], self.odict, _keychain)]
+        for _found, _node, _rest in _candidates:
+            for _key in _rest:
+                if not isinstance(_node, self._branch_type) or _key not in _node:
+                    break
+                _node = _node[_key]
+            else:
+                return tuple(_found + _rest)
+        return None
+
+    def _remove_data_index(self,token,groups):
+        # groups are what ValueTransformer._extract() matched in token, or None
         _token = token
         _keychain = None
         # there are variables like )){@[-1]/c} that look like variables but do not tokenize
-        _m = ValueTransformer()._extract(token)
-        if _m:
-            _keychain, _data_index = _m.groups()
+        if groups is not None:
+            _keychain, _data_index = groups
             if '/' in _keychain:
                 _token =  KEYCHAIN_LEFT_BOUND + _keychain + KEYCHAIN_RIGHT_BOUND
                 _keychain = _keychain.split('/')[-1]